@@ -1,18 +1,129 @@
 import streamlit as st
 import gspread
+from google.auth.transport.requests import AuthorizedSession, Request as GoogleAuthRequest
 from google.oauth2.service_account import Credentials
 import pandas as pd
+import numpy as np
 import json
+import re
+import functools
 import requests
-from io import StringIO
-from gspread.exceptions import SpreadsheetNotFound, WorksheetNotFound
-from datetime import datetime
+import random
+import sqlite3
+import os
+import hashlib
+import gzip
+import tempfile
+import logging
+from collections import Counter, OrderedDict
+from contextlib import contextmanager
+from dataclasses import dataclass, field, replace
+from io import BytesIO, StringIO
+from streamlit.runtime.scriptrunner import get_script_run_ctx
+from gspread.exceptions import APIError, GSpreadException, SpreadsheetNotFound, WorksheetNotFound
+from gspread.http_client import HTTPClient
+from gspread.utils import absolute_range_name, numericise_all
+from datetime import datetime, timezone
 import time
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+import pyarrow as pa
+import pyarrow.feather as feather
+import pyarrow.parquet as pq
+import openpyxl
+
+try:
+    import fcntl
+except ImportError:  # Windows: snapshot writers rely on atomic renames only
+    fcntl = None
+
+logger = logging.getLogger(__name__)
 
 # --- Configuration ---
 DEFAULT_SHEET_ID = "1_fICV_W3ru3zm4aAO6rU8zSXIw7dchD9tKD3JcFpF1k"
 DEFAULT_VIDEO_COLUMN_NAME = "videoUrl"
 
+# Local state shared by every Streamlit process on this host
+APP_DATA_DIR = os.environ.get("VLIVE_DATA_DIR", os.path.join(tempfile.gettempdir(), "vlive_sheets"))
+SNAPSHOT_DIR = os.path.join(APP_DATA_DIR, "snapshots")
+SNAPSHOT_MAX_AGE = 600  # seconds before a worksheet snapshot is re-fetched from the Sheets API
+DATASET_CACHE_TTL = 600  # seconds an in-process worksheet frame is served before reloading
+DATASET_CACHE_MAX_ENTRIES = 32
+DATASET_MAX_STALENESS = 3600  # seconds an expired frame may still be served while it is refreshed
+METADATA_TTL = 300  # seconds before worksheet lists and dimensions are refreshed
+
+# Recently read worksheets are refreshed in the background before they expire
+REFRESH_LEAD = 60  # seconds before expiry a refresh starts
+REFRESH_INTERVAL = 15  # seconds between refresher scans
+REFRESH_HOT_WINDOW = 1800  # seconds since its last read that a worksheet is kept fresh
+
+# Tabs that fail to prefetch are skipped for a backoff doubling from the base
+PREFETCH_RETRY_BASE = 60  # seconds
+PREFETCH_RETRY_MAX = 3600
+
+# Sheets API quotas (per minute, per user) enforced before every request
+SHEETS_READS_PER_MINUTE = 60
+SHEETS_WRITES_PER_MINUTE = 60
+SHEETS_BACKGROUND_RESERVE = 0.25  # share of each quota kept free of background work for sessions
+SHEETS_MAX_ATTEMPTS = 5
+SHEETS_BACKOFF_BASE = 1.0  # seconds, doubled after every retryable error
+SHEETS_BACKOFF_MAX = 64.0
+
+# Authorized clients are shared per key file and their tokens refreshed ahead of expiry
+SHEETS_POOL_SIZE = 16  # keep-alive connections per key
+TOKEN_REFRESH_MARGIN = 300  # seconds before expiry an access token is refreshed
+TOKEN_CHECK_INTERVAL = 60
+CREDENTIAL_IDLE_TIMEOUT = 3600  # seconds a key's client is kept without any session using it
+
+# Windowed loading reads only the rows of the current page (plus read-ahead)
+WINDOW_READ_AHEAD = 2  # extra pages fetched with each window read
+WINDOW_CACHE_MAX_PAGES = 256
+
+# Column types are inferred from a sample of each column when a dataset version is first used
+SCHEMA_SAMPLE_SIZE = 1000
+SCHEMA_MATCH_RATIO = 0.95  # share of sampled values that must parse for a type to be chosen
+CATEGORICAL_MAX_UNIQUE = 50
+RECENT_WINDOW_DAYS = 30  # "Recent" metric window
+
+# Near-duplicate detection (MinHash signatures bucketed by LSH bands)
+MINHASH_PERMUTATIONS = 64
+LSH_BANDS = 16  # 4 signature values per band: pairs above ~0.6 similarity usually share a bucket
+NEAR_DUPLICATE_THRESHOLD = 0.8  # estimated Jaccard similarity reported as a near-duplicate
+NEAR_DUPLICATE_DISPLAY_LIMIT = 50
+NEAR_DUPLICATE_BLOCK_PAIRS = 250_000
+NEAR_DUPLICATE_MAX_BUCKET = 32  # rows in one LSH bucket compared pairwise
+
+# Form submissions are coalesced per worksheet and written in batches
+APPEND_FLUSH_INTERVAL = 1.0  # seconds
+APPEND_MAX_ATTEMPTS = 3
+
+# Webhook deliveries go through a durable outbox drained in the background
+WEBHOOK_OUTBOX_PATH = os.path.join(APP_DATA_DIR, "webhook_outbox.sqlite3")
+WEBHOOK_CONCURRENCY = 4
+WEBHOOK_MAX_ATTEMPTS = 8
+WEBHOOK_BACKOFF_BASE = 2.0  # seconds, doubled after every failed attempt
+WEBHOOK_BACKOFF_MAX = 600.0
+WEBHOOK_LEASE = 60.0  # seconds a claimed delivery stays invisible to other dispatchers
+WEBHOOK_RETENTION = 7 * 24 * 3600  # seconds delivered rows are kept for latency stats
+
+# The data table is paged on the server; only the visible page is sent to the browser
+TABLE_PAGE_SIZES = [25, 50, 100, 250, 500]
+TABLE_CACHE_MAX_ORDERS = 32
+TABLE_CACHE_MAX_PAGES = 256
+
+# Downloads are generated on demand and cached on disk per dataset version and filter
+EXPORT_DIR = os.path.join(APP_DATA_DIR, "exports")
+EXPORT_CHUNK_ROWS = 50_000
+EXPORT_CACHE_MAX_FILES = 32
+
+# Bulk imports from CSV/JSON files
+IMPORT_DIR = os.path.join(APP_DATA_DIR, "imports")  # resume checkpoints
+IMPORT_CHUNK_ROWS = 500  # rows per append_rows call
+
+# Per-rerun timing spans are appended to a JSON-lines log
+PERF_LOG_PATH = os.path.join(APP_DATA_DIR, "perf_spans.jsonl")
+PERF_LOG_MAX_BYTES = 10 * 1024 * 1024  # rotated to .1 beyond this size
+
 # Define the scope for Google Sheets API
 SCOPES = [
     'https://www.googleapis.com/auth/spreadsheets',
@@ -292,6 +403,124 @@ CUSTOM_CSS = """
 </style>
 """
 
+# --- Private Local State ---
+
+def make_private_dir(path):
+    """Creates path, and APP_DATA_DIR if path lies inside it, accessible to this user only.
+
+    Snapshots, the webhook outbox and import checkpoints hold private sheet
+    contents, so a directory another user already owns (e.g. one planted in the
+    shared temp directory) is refused with PermissionError rather than used.
+    """
+    directories = [path]
+    if os.path.abspath(path).startswith(os.path.abspath(APP_DATA_DIR) + os.sep):
+        directories.insert(0, APP_DATA_DIR)
+    for directory in directories:
+        os.makedirs(directory, mode=0o700, exist_ok=True)
+        if not hasattr(os, "getuid"):
+            continue  # Windows: no POSIX ownership or permission bits to check
+        stat = os.stat(directory)
+        if stat.st_uid != os.getuid():
+            raise PermissionError(
+                f"{directory} is owned by another user; set VLIVE_DATA_DIR to a directory of your own"
+            )
+        if stat.st_mode & 0o077:
+            os.chmod(directory, 0o700)
+
+
+def open_private(path, mode="w", **kwargs):
+    """Opens path like open(), creating it readable and writable by this user only."""
+    return open(path, mode, opener=lambda name, flags: os.open(name, flags, 0o600), **kwargs)
+
+# --- Rerun Timing Spans ---
+
+class RerunTimer:
+    """Named, nestable timing spans for one run of the script.
+
+    Spans are shown in the sidebar performance panel at the end of the run and
+    appended to a JSON-lines log for offline analysis.
+    """
+
+    def __init__(self):
+        self.started_at = time.time()
+        self._origin = time.perf_counter()
+        self._depth = 0
+        self.spans = []
+
+    @contextmanager
+    def span(self, name):
+        """Times the enclosed block as a span called name."""
+        start = time.perf_counter()
+        depth, self._depth = self._depth, self._depth + 1
+        try:
+            yield
+        finally:
+            self._depth = depth
+            self.spans.append({
+                "name": name,
+                "depth": depth,
+                "start_ms": round((start - self._origin) * 1000, 3),
+                "duration_ms": round((time.perf_counter() - start) * 1000, 3),
+            })
+
+    def elapsed_ms(self):
+        """Returns the milliseconds since the run started."""
+        return (time.perf_counter() - self._origin) * 1000
+
+    def ordered_spans(self):
+        """Returns the spans in the order they started."""
+        return sorted(self.spans, key=lambda span: span["start_ms"])
+
+    def write_log(self, path, **context):
+        """Appends this run's spans as one JSON line, rotating the log once it exceeds PERF_LOG_MAX_BYTES."""
+        record = {
+            "ts": datetime.fromtimestamp(self.started_at).isoformat(timespec="milliseconds"),
+            "session_id": current_session_id(),
+            **context,
+            "total_ms": round(self.elapsed_ms(), 3),
+            "spans": self.ordered_spans(),
+        }
+        try:
+            make_private_dir(os.path.dirname(path))
+            if os.path.exists(path) and os.path.getsize(path) > PERF_LOG_MAX_BYTES:
+                os.replace(path, f"{path}.1")
+            with open_private(path, "a", encoding="utf-8") as log_file:
+                log_file.write(json.dumps(record, default=str) + "\n")
+        except OSError:
+            # Timing data is diagnostic only
+            pass
+
+
+def is_fragment_rerun():
+    """Returns whether the current run only reruns fragments rather than the whole script."""
+    ctx = get_script_run_ctx(suppress_warning=True)
+    return bool(ctx is not None and ctx.fragment_ids_this_run)
+
+
+def timed_fragment(name, **fragment_kwargs):
+    """Turns a page section into an st.fragment timed as the span called name.
+
+    When only the fragment reruns, its spans go to a fresh timer and are logged
+    as a run of their own.
+    """
+    def decorator(section):
+        @st.fragment(**fragment_kwargs)
+        @functools.wraps(section)
+        def fragment():
+            global rerun_timer
+            fragment_rerun = is_fragment_rerun()
+            if fragment_rerun:
+                rerun_timer = RerunTimer()
+            with rerun_timer.span(name):
+                section()
+            if fragment_rerun:
+                rerun_timer.write_log(PERF_LOG_PATH, fragment=name)
+        return fragment
+    return decorator
+
+
+rerun_timer = RerunTimer()
+
 # --- Page Configuration ---
 st.set_page_config(
     page_title="Enhanced VLIVE Google Sheets Viewer & Form",
@@ -317,153 +546,2991 @@ st.markdown("""
 st.sidebar.markdown("# 🔐 Configuration Panel")
 st.sidebar.markdown("---")
 
-# Authentication Section
-st.sidebar.header("🔑 Google Sheets Authentication")
-st.sidebar.markdown("""
-<div style='background-color: rgba(255,255,255,0.2); padding: 10px; border-radius: 8px; margin-bottom: 15px;'>
-    <small>Upload your Google Service Account JSON file to authenticate.</small>
-</div>
-""", unsafe_allow_html=True)
+# Authentication Section
+st.sidebar.header("🔑 Google Sheets Authentication")
+st.sidebar.markdown("""
+<div style='background-color: rgba(255,255,255,0.2); padding: 10px; border-radius: 8px; margin-bottom: 15px;'>
+    <small>Upload your Google Service Account JSON file to authenticate.</small>
+</div>
+""", unsafe_allow_html=True)
+
+uploaded_file = st.sidebar.file_uploader(
+    "Upload Service Account JSON", 
+    type="json", 
+    help="Upload the JSON key file for your Google Service Account with access to Google Sheets API."
+)
+
+# Sheet Configuration Section
+st.sidebar.markdown("---")
+st.sidebar.header("⚙️ Sheet Configuration")
+
+sheet_id = st.sidebar.text_input(
+    "Google Sheet ID", 
+    value=DEFAULT_SHEET_ID,
+    help="The unique ID from your Google Sheet URL (the long string between /d/ and /edit)."
+)
+
+video_col_name = st.sidebar.text_input(
+    "Video Link Column Name", 
+    value=DEFAULT_VIDEO_COLUMN_NAME,
+    help="The exact name of the column containing the video URLs (case-sensitive)."
+)
+
+# Webhook Configuration Section
+st.sidebar.markdown("---")
+st.sidebar.header("🔗 Webhook Configuration")
+st.sidebar.markdown("""
+<div style='background-color: rgba(255,255,255,0.2); padding: 10px; border-radius: 8px; margin-bottom: 15px;'>
+    <small>Optional: Configure a webhook to receive form submissions.</small>
+</div>
+""", unsafe_allow_html=True)
+
+webhook_url = st.sidebar.text_input(
+    "Webhook URL",
+    placeholder="https://your.webhook.site/endpoint",
+    help="URL to send form data to upon submission (optional)."
+)
+
+# Display Settings Section
+st.sidebar.markdown("---")
+st.sidebar.header("🎨 Display Settings")
+
+items_per_page = st.sidebar.slider(
+    "Videos Per Page",
+    min_value=2,
+    max_value=20,
+    value=10,
+    step=2,
+    help="Number of videos to display per page in the viewer."
+)
+
+video_columns = st.sidebar.radio(
+    "Video Layout",
+    options=[1, 2, 3],
+    index=1,
+    help="Number of columns for video display."
+)
+
+show_index = st.sidebar.checkbox(
+    "Show Row Numbers",
+    value=True,
+    help="Display row numbers in the data table."
+)
+
+paged_table = st.sidebar.checkbox(
+    "Paged Data Table",
+    value=True,
+    help="Send only one page of the data table to the browser, with server-side sorting and column selection."
+)
+
+# --- Worksheet Snapshot Store ---
+
+@dataclass
+class Snapshot:
+    """A worksheet frame as read from (or written to) the snapshot store."""
+    df: pd.DataFrame
+    version: str
+    fetched_at: float
+    parent_version: str = None  # set when this version only appends rows to parent_version
+    revision: str = None  # Drive modifiedTime of the spreadsheet when the rows were fetched
+
+
+class SnapshotStore:
+    """Arrow IPC snapshots of loaded worksheets, shared by all server processes on the host.
+
+    Files are keyed by sheet ID + worksheet name, read through a memory map and
+    replaced atomically, so readers never take a lock. Writers serialize on a
+    per-worksheet lock file so only one process refetches a given worksheet.
+    """
+
+    def __init__(self, root):
+        self.root = root
+        make_private_dir(root)
+
+    def _path(self, sheet_id, worksheet_name):
+        key = hashlib.sha1(f"{sheet_id}\x00{worksheet_name}".encode("utf-8")).hexdigest()
+        return os.path.join(self.root, f"{key}.arrow")
+
+    @contextmanager
+    def writer_lock(self, sheet_id, worksheet_name):
+        """Holds the exclusive per-worksheet lock used by snapshot writers."""
+        if fcntl is None:
+            yield
+            return
+        with open_private(self._path(sheet_id, worksheet_name) + ".lock", "a+") as lock_file:
+            fcntl.flock(lock_file, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+    def read(self, sheet_id, worksheet_name, max_age=None):
+        """Returns the stored snapshot, or None if it is missing, unreadable or older than max_age."""
+        try:
+            table = feather.read_table(self._path(sheet_id, worksheet_name), memory_map=True)
+        except (OSError, pa.ArrowInvalid):
+            return None
+
+        metadata = table.schema.metadata or {}
+        fetched_at = float(metadata.get(b"fetched_at", b"0"))
+        if max_age is not None and time.time() - fetched_at > max_age:
+            return None
+
+        version = metadata.get(b"version", b"").decode("utf-8")
+        revision = metadata.get(b"revision", b"").decode("utf-8") or None
+        df = table.to_pandas()
+        return Snapshot(df, version, fetched_at, revision=revision)
+
+    def write(self, sheet_id, worksheet_name, df, fetched_at=None, version=None, revision=None):
+        """Stores df as the current snapshot and returns it as a Snapshot.
+
+        Columns Arrow cannot store natively (e.g. numbers mixed with blank strings,
+        as returned by get_all_records) are stored as text, and the returned frame
+        reflects that so every process sees identical data.
+        """
+        fetched_at = time.time() if fetched_at is None else fetched_at
+        version = f"{time.time_ns():x}" if version is None else version
+        try:
+            table = pa.Table.from_pandas(df, preserve_index=False)
+        except (pa.ArrowInvalid, pa.ArrowTypeError):
+            df = df.copy()
+            object_cols = df.select_dtypes(include=["object", "string"]).columns
+            df[object_cols] = df[object_cols].astype(str)
+            table = pa.Table.from_pandas(df, preserve_index=False)
+
+        table = table.replace_schema_metadata({
+            **(table.schema.metadata or {}),
+            b"fetched_at": repr(fetched_at).encode("utf-8"),
+            b"version": version.encode("utf-8"),
+            b"revision": (revision or "").encode("utf-8"),
+        })
+        path = self._path(sheet_id, worksheet_name)
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        try:
+            with open_private(tmp_path, "wb") as f:
+                feather.write_feather(table, f, compression="uncompressed")
+            os.replace(tmp_path, path)
+        except OSError:
+            # The snapshot is an optimization; serve the fetched data regardless
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+        return Snapshot(df, version, fetched_at, revision=revision)
+
+    def invalidate(self, sheet_id, worksheet_name):
+        """Removes the snapshot so the next load refetches from the Sheets API."""
+        try:
+            os.remove(self._path(sheet_id, worksheet_name))
+        except FileNotFoundError:
+            pass
+
+
+@st.cache_resource
+def get_snapshot_store():
+    """Returns the process-wide snapshot store."""
+    return SnapshotStore(SNAPSHOT_DIR)
+
+class DatasetCache:
+    """Worksheet frames shared by every session of this process, keyed by (sheet_id, worksheet_name).
+
+    Unlike st.cache_data, entries are mutable: they can be invalidated one
+    worksheet at a time and extended in place after a successful append.
+    """
+
+    def __init__(self, ttl=DATASET_CACHE_TTL, max_entries=DATASET_CACHE_MAX_ENTRIES):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, sheet_id, worksheet_name, max_age=None):
+        """Returns the cached Snapshot, or None if it is missing or older than max_age (default: the TTL)."""
+        key = (sheet_id, worksheet_name)
+        max_age = self.ttl if max_age is None else max_age
+        with self._lock:
+            snapshot = self._entries.get(key)
+            if snapshot is None or time.time() - snapshot.fetched_at > max_age:
+                return None
+            self._entries.move_to_end(key)
+            return snapshot
+
+    def put(self, sheet_id, worksheet_name, snapshot):
+        """Stores a Snapshot, evicting the least recently used worksheet if full."""
+        with self._lock:
+            self._entries[(sheet_id, worksheet_name)] = snapshot
+            self._entries.move_to_end((sheet_id, worksheet_name))
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def replace(self, sheet_id, worksheet_name, snapshot, expected_version):
+        """Swaps in a refreshed Snapshot unless the entry changed since expected_version was read.
+
+        Returns whether the swap happened; an append written through meanwhile wins.
+        """
+        key = (sheet_id, worksheet_name)
+        with self._lock:
+            current = self._entries.get(key)
+            if current is None or current.version != expected_version:
+                return False
+            self._entries[key] = snapshot
+            return True
+
+    def invalidate(self, sheet_id, worksheet_name):
+        """Drops one worksheet's cached frame."""
+        with self._lock:
+            self._entries.pop((sheet_id, worksheet_name), None)
+
+    def append_rows(self, sheet_id, worksheet_name, rows):
+        """Appends rows written to the sheet to the cached frame as a new version.
+
+        Values are mapped to columns positionally, as append_rows writes them,
+        numericised like get_all_records would and cast to the cached column's
+        dtype, so a column stored as text stays text. Returns the new Snapshot,
+        or None if nothing is cached or the rows do not fit the cached header.
+        """
+        with self._lock:
+            snapshot = self._entries.get((sheet_id, worksheet_name))
+            columns = list(snapshot.df.columns) if snapshot is not None else []
+            if snapshot is None or not columns or any(len(row) > len(columns) for row in rows):
+                return None
+
+            new_rows = pd.DataFrame(
+                [numericise_all(list(row) + [""] * (len(columns) - len(row))) for row in rows],
+                columns=columns,
+                index=pd.RangeIndex(len(snapshot.df), len(snapshot.df) + len(rows))
+            )
+            for column in columns:
+                dtype = snapshot.df[column].dtype
+                values = new_rows[column] if pd.api.types.is_numeric_dtype(dtype) else new_rows[column].astype(str)
+                try:
+                    new_rows[column] = values.astype(dtype)
+                except (ValueError, TypeError):
+                    pass  # e.g. text in a numeric column: the snapshot store writes the column as text
+            df = pd.concat([snapshot.df, new_rows])
+            updated = Snapshot(df, f"{time.time_ns():x}", snapshot.fetched_at, parent_version=snapshot.version)
+            self._entries[(sheet_id, worksheet_name)] = updated
+            return updated
+
+
+@st.cache_resource
+def get_dataset_cache():
+    """Returns the dataset cache shared by all sessions."""
+    return DatasetCache()
+
+
+def invalidate_dataset(sheet_id, worksheet_name):
+    """Forces the next load of one worksheet to refetch it from the Sheets API."""
+    get_dataset_cache().invalidate(sheet_id, worksheet_name)
+    get_snapshot_store().invalidate(sheet_id, worksheet_name)
+    get_row_window_cache().invalidate(sheet_id, worksheet_name)
+
+# --- Request Coalescing ---
+
+class SingleFlight:
+    """Coalesces concurrent identical reads: the first caller for a key runs the fetch, later callers wait for its result.
+
+    Counts, per operation, how many calls ran a fetch and how many were coalesced into one.
+    """
+
+    def __init__(self):
+        self._in_flight = {}  # key -> Future
+        self._lock = threading.Lock()
+        self.executed = Counter()
+        self.coalesced = Counter()
+
+    def do(self, operation, key, fn, *args):
+        """Returns fn(*args), sharing the call (and any exception) with concurrent callers of the same key."""
+        flight_key = (operation, key)
+        with self._lock:
+            future = self._in_flight.get(flight_key)
+            leader = future is None
+            if leader:
+                future = self._in_flight[flight_key] = Future()
+                self.executed[operation] += 1
+            else:
+                self.coalesced[operation] += 1
+        if not leader:
+            return future.result()
+
+        try:
+            result = fn(*args)
+        except BaseException as e:
+            future.set_exception(e)
+            raise
+        else:
+            future.set_result(result)
+            return result
+        finally:
+            with self._lock:
+                del self._in_flight[flight_key]
+
+    def stats(self):
+        """Returns {operation: (executed, coalesced)}."""
+        with self._lock:
+            return {op: (self.executed[op], self.coalesced[op]) for op in sorted(self.executed | self.coalesced)}
+
+
+@st.cache_resource
+def get_singleflight():
+    """Returns the request coalescer shared by all sessions."""
+    return SingleFlight()
+
+# --- Spreadsheet Metadata Cache ---
+
+@dataclass
+class SpreadsheetMetadata:
+    """Handles and layout of one spreadsheet, reused by the selector, loader and form."""
+    spreadsheet: gspread.Spreadsheet
+    worksheets: dict  # title -> gspread.Worksheet, in tab order
+    fetched_at: float
+    headers: dict = field(default_factory=dict)  # title -> header row, filled on first use
+
+    def worksheet(self, title):
+        """Returns the cached worksheet handle, raising WorksheetNotFound like gspread."""
+        try:
+            return self.worksheets[title]
+        except KeyError:
+            raise WorksheetNotFound(title)
+
+
+class MetadataCache:
+    """Spreadsheet metadata (tabs, IDs, dimensions, header rows) cached per (client, sheet_id).
+
+    A refresh opens the spreadsheet once and lists its worksheets; header rows
+    for every tab are then read together with a single batched values call the
+    first time they are needed. Steady-state reruns make no API calls.
+    """
+
+    def __init__(self, ttl=METADATA_TTL):
+        self.ttl = ttl
+        self._entries = {}
+        self._lock = threading.Lock()
+
+    def get(self, gc, sheet_id):
+        """Returns fresh metadata for sheet_id, fetching it if missing or expired."""
+        with self._lock:
+            metadata = self._entries.get((gc, sheet_id))
+        if metadata is not None and time.time() - metadata.fetched_at <= self.ttl:
+            return metadata
+        return get_singleflight().do("spreadsheet_metadata", (gc, sheet_id), self._fetch, gc, sheet_id)
+
+    def _fetch(self, gc, sheet_id):
+        spreadsheet = gc.open_by_key(sheet_id)
+        worksheets = {ws.title: ws for ws in spreadsheet.worksheets()}
+        metadata = SpreadsheetMetadata(spreadsheet, worksheets, time.time())
+        with self._lock:
+            self._entries[(gc, sheet_id)] = metadata
+        return metadata
+
+    def headers(self, gc, sheet_id):
+        """Returns the header row of every worksheet, keyed by title."""
+        metadata = self.get(gc, sheet_id)
+        if not metadata.headers and metadata.worksheets:
+            ranges = [absolute_range_name(title, "1:1") for title in metadata.worksheets]
+            response = metadata.spreadsheet.values_batch_get(ranges)
+            metadata.headers = {
+                title: (value_range.get("values") or [[]])[0]
+                for title, value_range in zip(metadata.worksheets, response.get("valueRanges", []))
+            }
+        return metadata.headers
+
+    def invalidate(self, sheet_id):
+        """Drops cached metadata for sheet_id for every client."""
+        with self._lock:
+            for key in [key for key in self._entries if key[1] == sheet_id]:
+                del self._entries[key]
+
+
+@st.cache_resource
+def get_metadata_cache():
+    """Returns the spreadsheet metadata cache shared by all sessions."""
+    return MetadataCache()
+
+# --- Sheets API Rate Limiting ---
+
+def current_session_id():
+    """Returns the Streamlit session ID of the calling thread, or None outside a session's script thread."""
+    ctx = get_script_run_ctx(suppress_warning=True)
+    return ctx.session_id if ctx is not None else None
+
+
+class SheetsRateLimiter:
+    """Token buckets for the Sheets API per-minute read and write quotas, shared by every client in the process.
+
+    Session script threads are served first: background threads (refresher,
+    prefetcher, append queue) wait while a session is waiting and never take the
+    last background_reserve share of a bucket. Calls, retries and throttle waits
+    are counted globally and per session.
+    """
+
+    MAX_TRACKED_SESSIONS = 256
+
+    def __init__(self, reads_per_minute=SHEETS_READS_PER_MINUTE, writes_per_minute=SHEETS_WRITES_PER_MINUTE,
+                 background_reserve=SHEETS_BACKGROUND_RESERVE):
+        self.capacity = {"read": reads_per_minute, "write": writes_per_minute}
+        self.background_reserve = background_reserve
+        self._tokens = dict(self.capacity)
+        self._refilled_at = time.monotonic()
+        self._interactive_waiting = 0
+        self._cond = threading.Condition()
+        self.counters = Counter()
+        self._session_counters = OrderedDict()  # session_id -> Counter
+
+    def _refill(self):
+        now = time.monotonic()
+        elapsed, self._refilled_at = now - self._refilled_at, now
+        for kind, capacity in self.capacity.items():
+            self._tokens[kind] = min(capacity, self._tokens[kind] + elapsed * capacity / 60)
+
+    def acquire(self, kind):
+        """Takes one token from the read or write bucket, waiting for it if needed. Returns the seconds waited."""
+        interactive = current_session_id() is not None
+        floor = 0 if interactive else self.capacity[kind] * self.background_reserve
+        started = time.monotonic()
+        with self._cond:
+            if interactive:
+                self._interactive_waiting += 1
+            try:
+                while True:
+                    self._refill()
+                    if self._tokens[kind] >= floor + 1 and (interactive or not self._interactive_waiting):
+                        self._tokens[kind] -= 1
+                        break
+                    shortfall = max(floor + 1 - self._tokens[kind], 0)
+                    self._cond.wait(max(shortfall * 60 / self.capacity[kind], 0.05))
+            finally:
+                if interactive:
+                    self._interactive_waiting -= 1
+                    self._cond.notify_all()
+        return time.monotonic() - started
+
+    def drain(self, kind):
+        """Empties a bucket after the API reported its quota exhausted, so every caller slows down."""
+        with self._cond:
+            self._refill()
+            self._tokens[kind] = 0
+
+    def record(self, **counts):
+        """Adds counts to the global counters and to the calling session's counters."""
+        session_id = current_session_id()
+        with self._cond:
+            self.counters.update(counts)
+            if session_id is not None:
+                self._session_counters.setdefault(session_id, Counter()).update(counts)
+                self._session_counters.move_to_end(session_id)
+                while len(self._session_counters) > self.MAX_TRACKED_SESSIONS:
+                    self._session_counters.popitem(last=False)
+
+    def session_counters(self, session_id):
+        """Returns a copy of one session's counters."""
+        with self._cond:
+            return Counter(self._session_counters.get(session_id, ()))
+
+
+@st.cache_resource
+def get_sheets_rate_limiter():
+    """Returns the Sheets API rate limiter shared by all sessions."""
+    return SheetsRateLimiter()
+
+
+def is_quota_api_error(error):
+    """Returns whether a Sheets/Drive API error rejected a request for exceeding a quota."""
+    status = error.response.status_code
+    if status == 429:
+        return True
+    # Drive reports exhausted quotas as 403 with a usageLimits reason
+    reasons = error.error.get("errors", []) if isinstance(error.error, dict) else []
+    return status == 403 and any(reason.get("domain") == "usageLimits" for reason in reasons)
+
+
+def is_retryable_api_error(error):
+    """Returns whether a Sheets/Drive API error is a quota or server error worth retrying."""
+    status = error.response.status_code
+    return status == 408 or status >= 500 or is_quota_api_error(error)
+
+
+class RateLimitedHTTPClient(HTTPClient):
+    """gspread HTTP client that takes a quota token before every request and retries failures with jittered backoff.
+
+    Reads are retried on quota and server errors. Writes are retried only on quota
+    errors, which reject a request before it is applied: a write that timed out
+    or failed with a 5xx may still have landed, and appending it again would
+    duplicate rows, so that decision is left to the caller.
+    """
+
+    def request(self, method, endpoint, *args, **kwargs):
+        limiter = get_sheets_rate_limiter()
+        kind = "read" if method.upper() == "GET" else "write"
+        for attempt in range(1, SHEETS_MAX_ATTEMPTS + 1):
+            waited = limiter.acquire(kind)
+            limiter.record(calls=1, throttle_waits=int(waited > 0.01), throttled_seconds=waited)
+            try:
+                return super().request(method, endpoint, *args, **kwargs)
+            except APIError as e:
+                retryable = is_retryable_api_error(e) if kind == "read" else is_quota_api_error(e)
+                if not retryable or attempt == SHEETS_MAX_ATTEMPTS:
+                    limiter.record(errors=1)
+                    raise
+                if e.response.status_code == 429:
+                    limiter.drain(kind)
+                limiter.record(retries=1)
+                # Full jitter keeps retrying sessions from hitting the API in lockstep
+                time.sleep(random.uniform(0, min(SHEETS_BACKOFF_MAX, SHEETS_BACKOFF_BASE * 2 ** (attempt - 1))))
+
+# --- Credential Manager ---
+
+def key_fingerprint(key_file_bytes):
+    """Returns a stable fingerprint of an uploaded service account key file."""
+    return hashlib.sha256(key_file_bytes).hexdigest()
+
+
+@dataclass
+class AuthorizedClient:
+    """One authorized gspread client and the credentials behind it."""
+    client: gspread.Client
+    credentials: Credentials
+    token_request: GoogleAuthRequest  # plain transport for token refreshes, outside the authorized session
+    last_used: float
+
+
+class CredentialManager:
+    """Authorized gspread clients keyed by key file fingerprint, shared by every session using that key.
+
+    Each key gets one AuthorizedSession with a keep-alive connection pool. A
+    background thread refreshes access tokens token_refresh_margin seconds before
+    they expire, so requests never wait on the OAuth token exchange. Keys unused
+    for idle_timeout seconds are dropped and re-authorized on their next use.
+    """
+
+    def __init__(self, token_refresh_margin=TOKEN_REFRESH_MARGIN, check_interval=TOKEN_CHECK_INTERVAL,
+                 idle_timeout=CREDENTIAL_IDLE_TIMEOUT):
+        self.token_refresh_margin = token_refresh_margin
+        self.check_interval = check_interval
+        self.idle_timeout = idle_timeout
+        self._clients = {}  # fingerprint -> AuthorizedClient
+        self._lock = threading.Lock()
+        self._thread = None
+
+    def client(self, fingerprint, service_account_info):
+        """Returns the authorized client for a key, authorizing it on first use."""
+        with self._lock:
+            entry = self._clients.get(fingerprint)
+            if entry is not None:
+                entry.last_used = time.time()
+                return entry.client
+
+        credentials = Credentials.from_service_account_info(service_account_info, scopes=SCOPES)
+        session = AuthorizedSession(credentials)
+        adapter = requests.adapters.HTTPAdapter(pool_connections=4, pool_maxsize=SHEETS_POOL_SIZE)
+        session.mount("https://", adapter)
+        # Token exchanges must not go through the authorized session, which would sign them itself
+        token_request = GoogleAuthRequest(requests.Session())
+        credentials.refresh(token_request)
+        gc = gspread.authorize(credentials, http_client=RateLimitedHTTPClient, session=session)
+
+        with self._lock:
+            # Another session may have authorized the same key meanwhile; keep one client per key
+            entry = self._clients.setdefault(
+                fingerprint, AuthorizedClient(gc, credentials, token_request, time.time())
+            )
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._run, name="token-refresher", daemon=True)
+                self._thread.start()
+            return entry.client
+
+    def _run(self):
+        while True:
+            time.sleep(self.check_interval)
+            now = time.time()
+            with self._lock:
+                for fingerprint in [fp for fp, entry in self._clients.items() if now - entry.last_used > self.idle_timeout]:
+                    del self._clients[fingerprint]
+                entries = list(self._clients.values())
+            for entry in entries:
+                expiry = entry.credentials.expiry
+                if expiry is None or expiry.replace(tzinfo=timezone.utc).timestamp() - now < self.token_refresh_margin:
+                    try:
+                        entry.credentials.refresh(entry.token_request)
+                    except Exception:
+                        # The session refreshes the token itself on its next request
+                        pass
+
+
+@st.cache_resource
+def get_credential_manager():
+    """Returns the credential manager shared by all sessions."""
+    return CredentialManager()
+
+# --- Helper Functions ---
+
+def get_gspread_client(service_account_info, fingerprint):
+    """Returns the shared authorized gspread client for the key file with the given fingerprint."""
+    try:
+        return get_credential_manager().client(fingerprint, service_account_info)
+    except Exception as e:
+        st.error(f"❌ Authentication failed. Error details: {str(e)}")
+        st.info("💡 Make sure your JSON file contains valid service account credentials and that the Google Sheets API is enabled.")
+        return None
+
+def load_data(_gc, sheet_id, worksheet_name, batch_worksheets=None):
+    """Loads data from the specified worksheet, preferring cached frames and on-disk snapshots over the Sheets API.
+
+    When batch_worksheets is given, a cache miss fetches those worksheets together
+    with the requested one in a single batched request. The returned frame is
+    shared with other sessions and must not be modified.
+
+    An expired frame younger than DATASET_MAX_STALENESS is served as is while the
+    background refresher replaces it.
+    """
+    cache, refresher = get_dataset_cache(), get_dataset_refresher()
+    refresher.touch(_gc, sheet_id, worksheet_name)
+    snapshot = cache.get(sheet_id, worksheet_name, max_age=DATASET_MAX_STALENESS)
+    if snapshot is not None:
+        if time.time() - snapshot.fetched_at > cache.ttl:
+            refresher.wake()
+        return with_snapshot_attrs(snapshot), None
+
+    store = get_snapshot_store()
+    snapshot = store.read(sheet_id, worksheet_name, max_age=DATASET_MAX_STALENESS)
+    if snapshot is not None:
+        cache.put(sheet_id, worksheet_name, snapshot)
+        if time.time() - snapshot.fetched_at > SNAPSHOT_MAX_AGE:
+            refresher.wake()
+        return with_snapshot_attrs(snapshot), None
+
+    try:
+        # Sessions missing the same worksheet at the same time share one fetch
+        snapshot = get_singleflight().do(
+            "load_data", (sheet_id, worksheet_name), fetch_snapshot, _gc, sheet_id, worksheet_name, batch_worksheets
+        )
+        return with_snapshot_attrs(snapshot), None
+    except SpreadsheetNotFound:
+        error_msg = f"Spreadsheet with ID '{sheet_id}' not found. Please check the Sheet ID and ensure the service account has access."
+        return pd.DataFrame(), error_msg
+    except WorksheetNotFound:
+        error_msg = f"Worksheet '{worksheet_name}' not found in the spreadsheet."
+        return pd.DataFrame(), error_msg
+    except APIError as e:
+        if is_retryable_api_error(e):
+            error_msg = "Google Sheets API quota exceeded or unavailable. Please try again in a minute."
+        else:
+            error_msg = f"Error loading data: {str(e)}"
+        return pd.DataFrame(), error_msg
+    except Exception as e:
+        error_msg = f"Error loading data: {str(e)}"
+        return pd.DataFrame(), error_msg
+
+def fetch_snapshot(gc, sheet_id, worksheet_name, batch_worksheets=None):
+    """Reads one worksheet from the Sheets API (or a snapshot another process just wrote) and caches it."""
+    store = get_snapshot_store()
+    with store.writer_lock(sheet_id, worksheet_name):
+        # Another process may have refreshed the snapshot while we waited for the lock
+        snapshot = store.read(sheet_id, worksheet_name, max_age=SNAPSHOT_MAX_AGE)
+        if snapshot is None and batch_worksheets:
+            names = [worksheet_name] + [name for name in batch_worksheets if name != worksheet_name]
+            snapshot = load_worksheets_batch(gc, sheet_id, names)[worksheet_name]
+        elif snapshot is None:
+            worksheet = get_metadata_cache().get(gc, sheet_id).worksheet(worksheet_name)
+            data = worksheet.get_all_records()
+            snapshot = store.write(sheet_id, worksheet_name, pd.DataFrame(data))
+    get_dataset_cache().put(sheet_id, worksheet_name, snapshot)
+    return snapshot
+
+def records_frame(values):
+    """Builds a frame from raw worksheet values the way get_all_records does (header row, padding, numericising)."""
+    if not values or values == [[]]:
+        return pd.DataFrame()
+
+    width = max(len(row) for row in values)
+    header = values[0] + [""] * (width - len(values[0]))
+    duplicates = [key for key, count in Counter(header).items() if count > 1]
+    if duplicates:
+        raise GSpreadException(f"the header row in the worksheet contains duplicates: {duplicates}")
+
+    rows = [numericise_all(row + [""] * (width - len(row))) for row in values[1:]]
+    return pd.DataFrame(rows, columns=header)
+
+def load_worksheets_batch(gc, sheet_id, worksheet_names):
+    """Fetches several worksheets with one batched values request and caches each of them.
+
+    Returns a dict of worksheet name -> Snapshot.
+    """
+    metadata = get_metadata_cache().get(gc, sheet_id)
+    for name in worksheet_names:
+        metadata.worksheet(name)  # raises WorksheetNotFound before spending an API call
+
+    response = metadata.spreadsheet.values_batch_get([absolute_range_name(name) for name in worksheet_names])
+    store, cache = get_snapshot_store(), get_dataset_cache()
+    snapshots = {}
+    for name, value_range in zip(worksheet_names, response.get("valueRanges", [])):
+        snapshot = store.write(sheet_id, name, records_frame(value_range.get("values", [])))
+        cache.put(sheet_id, name, snapshot)
+        snapshots[name] = snapshot
+    return snapshots
+
+def with_snapshot_attrs(snapshot):
+    """Returns the snapshot frame tagged with its dataset version and fetch time."""
+    df = snapshot.df
+    df.attrs["dataset_version"] = snapshot.version
+    df.attrs["fetched_at"] = snapshot.fetched_at
+    df.attrs["parent_version"] = snapshot.parent_version
+    return df
+
+def get_worksheet_list(_gc, sheet_id):
+    """Retrieves list of worksheet names from the spreadsheet."""
+    try:
+        worksheet_titles = list(get_metadata_cache().get(_gc, sheet_id).worksheets)
+        return worksheet_titles, None
+    except SpreadsheetNotFound:
+        return [], f"Spreadsheet with ID '{sheet_id}' not found."
+    except Exception as e:
+        return [], f"Could not retrieve worksheet list. Error: {str(e)}"
+
+def format_age(seconds):
+    """Formats a duration in seconds as a short age such as "42s", "5m" or "2h 10m"."""
+    seconds = int(max(seconds, 0))
+    if seconds < 60:
+        return f"{seconds}s"
+    if seconds < 3600:
+        return f"{seconds // 60}m"
+    return f"{seconds // 3600}h {seconds % 3600 // 60}m"
+
+def format_timestamp(timestamp):
+    """Formats timestamp for display."""
+    try:
+        if isinstance(timestamp, datetime):
+            return timestamp.strftime("%B %d, %Y at %I:%M %p")
+        if isinstance(timestamp, str):
+            dt = datetime.strptime(timestamp, "%Y-%m-%d %H:%M:%S")
+            return dt.strftime("%B %d, %Y at %I:%M %p")
+        return timestamp
+    except:
+        return timestamp
+
+# --- Per-Version Derived Artifacts ---
+
+class LatestArtifact:
+    """An artifact derived from one worksheet's dataset (search index, typed columns, ...), held for one version.
+
+    A version that only appends rows to the held one (its parent_version) is
+    derived by extending the held artifact with the new rows; any other version
+    is built from scratch. Only the latest requested version is held, so a
+    superseded version's artifact is released as soon as its successor is built.
+    """
+
+    def __init__(self, build, extend):
+        self.build = build  # df -> artifact
+        self.extend = extend  # (artifact, df) -> artifact covering df
+        self.version = None
+        self.columns = []
+        self.n_rows = 0
+        self.artifact = None
+        self._lock = threading.Lock()
+
+    def get(self, df):
+        """Returns the artifact for df's dataset version, extending or rebuilding the held one first if needed."""
+        with self._lock:
+            version = df.attrs.get("dataset_version")
+            if self.artifact is None or version != self.version:
+                appended = (
+                    self.artifact is not None and df.attrs.get("parent_version") == self.version
+                    and list(df.columns) == self.columns and len(df) >= self.n_rows
+                )
+                if appended:
+                    self.artifact = self.extend(self.artifact, df)
+                else:
+                    self.artifact = None  # release the superseded artifact before building its successor
+                    self.artifact = self.build(df)
+                self.version, self.columns, self.n_rows = version, list(df.columns), len(df)
+            return self.artifact
+
+
+@st.cache_resource
+def get_artifact_store():
+    """Returns the latest derived artifacts per (kind, sheet, worksheet, ...) key, shared by all sessions."""
+    return {}
+
+
+def get_artifact(key, df, build, extend):
+    """Returns the artifact of kind key[0] for df, built directly if df is an unversioned window page."""
+    if df.attrs.get("dataset_version") is None:
+        return build(df)
+    return get_artifact_store().setdefault(key, LatestArtifact(build, extend)).get(df)
+
+# --- Full-Text Search Index ---
+
+SEARCH_TOKEN_PATTERN = r"\w+"
+SEARCH_QUERY_RE = re.compile(r'"([^"]+)"|(\S+)')
+
+
+class SearchIndex:
+    """Token inverted index over every cell of a dataset, answering substring queries ranked by BM25.
+
+    Postings are stored CSR-style: entries for vocabulary token i live at
+    [offsets[i], offsets[i + 1]) of the rows/cols/tf arrays. Substring terms are
+    resolved against the vocabulary (through a lazily built trigram index)
+    instead of the cells, and only terms spanning several tokens are verified
+    against the raw text of their candidate rows.
+    """
+
+    BM25_K1 = 1.2
+    BM25_B = 0.75
+
+    def __init__(self, df):
+        self.n_rows = len(df)
+        self.columns = list(df.columns)
+        self._col_codes = {col: code for code, col in enumerate(self.columns)}
+        self._text = self._lowered(df)
+
+        tokens, self._rows, self._cols, self._tf = self._postings(self._text, 0)
+        self.vocab, starts = np.unique(tokens, return_index=True)
+        self._sorter = np.arange(len(self.vocab))  # vocabulary ids in token order
+        self._offsets = np.append(starts, len(tokens))
+        self._row_len, self._cell_len = self._lengths(self._rows, self._cols, self._tf, 0, self.n_rows)
+
+        self._trigrams = None
+        self._fragment_cache = {}
+
+    def _lowered(self, df):
+        return [df[col].astype(str).str.lower().to_numpy() for col in self.columns]
+
+    @staticmethod
+    def _postings(texts, first_row):
+        """Returns (token, row, col, tf) arrays of the tokens in texts, sorted by token, row and column."""
+        frames = []
+        for code, text in enumerate(texts):
+            tokens = pd.Series(text).str.findall(SEARCH_TOKEN_PATTERN).explode().dropna()
+            frames.append(pd.DataFrame({
+                "token": tokens.to_numpy(),
+                "row": tokens.index.to_numpy() + first_row,
+                "col": code,
+            }))
+        cells = pd.concat(frames, ignore_index=True) if frames else pd.DataFrame(columns=["token", "row", "col"])
+        counts = cells.groupby(["token", "row", "col"], sort=True).size()
+        return (
+            counts.index.get_level_values("token").to_numpy(),
+            counts.index.get_level_values("row").to_numpy(dtype=np.int64),
+            counts.index.get_level_values("col").to_numpy(dtype=np.int64),
+            counts.to_numpy(dtype=np.float64),
+        )
+
+    def _lengths(self, rows, cols, tf, first_row, n_rows):
+        """Returns document lengths in tokens of rows [first_row, first_row + n_rows), per row and per cell."""
+        rows = rows - first_row
+        row_len = np.bincount(rows, weights=tf, minlength=n_rows)
+        n_cols = max(len(self.columns), 1)
+        cell_len = np.bincount(cols * n_rows + rows, weights=tf, minlength=n_cols * n_rows).reshape(n_cols, n_rows)
+        return row_len, cell_len
+
+    def extended(self, df):
+        """Returns the index of df, tokenizing only the rows after the ones indexed here.
+
+        Tokens keep their ids and new tokens get the next ones, so the trigram
+        index, if built, is carried over with only the new tokens added.
+        """
+        index = SearchIndex.__new__(SearchIndex)
+        index.n_rows = len(df)
+        index.columns = self.columns
+        index._col_codes = self._col_codes
+        added = self._lowered(df.iloc[self.n_rows:])
+        index._text = [np.concatenate([text, more]) for text, more in zip(self._text, added)]
+
+        tokens, rows, cols, tf = self._postings(added, self.n_rows)
+        added_vocab, starts = np.unique(tokens, return_index=True)
+        sorted_vocab = self.vocab[self._sorter]
+        at = np.searchsorted(sorted_vocab, added_vocab)
+        known = at < len(sorted_vocab)
+        known[known] = sorted_vocab[at[known]] == added_vocab[known]
+        added_ids = np.empty(len(added_vocab), dtype=np.int64)
+        added_ids[known] = self._sorter[at[known]]
+        added_ids[~known] = len(self.vocab) + np.arange((~known).sum())
+        index.vocab = np.concatenate([self.vocab, added_vocab[~known]])
+        index._sorter = np.insert(self._sorter, at[~known], added_ids[~known])
+
+        # Both postings lists are grouped by token and the new rows follow the old ones,
+        # so a stable sort on the token ids keeps every token's rows in order
+        token_ids = np.concatenate([
+            np.repeat(np.arange(len(self.vocab)), np.diff(self._offsets)),
+            np.repeat(added_ids, np.diff(np.append(starts, len(tokens)))),
+        ])
+        order = np.argsort(token_ids, kind="stable")
+        index._rows = np.concatenate([self._rows, rows])[order]
+        index._cols = np.concatenate([self._cols, cols])[order]
+        index._tf = np.concatenate([self._tf, tf])[order]
+        index._offsets = np.searchsorted(token_ids[order], np.arange(len(index.vocab) + 1))
+
+        row_len, cell_len = self._lengths(rows, cols, tf, self.n_rows, index.n_rows - self.n_rows)
+        index._row_len = np.concatenate([self._row_len, row_len])
+        index._cell_len = np.hstack([self._cell_len, cell_len])
+
+        index._trigrams = None
+        if self._trigrams is not None:
+            added_trigrams = {}
+            for i in range(len(self.vocab), len(index.vocab)):
+                token = index.vocab[i]
+                for j in range(len(token) - 2):
+                    added_trigrams.setdefault(token[j:j + 3], set()).add(i)
+            # The held index may be searched meanwhile, so its sets are copied rather than updated
+            index._trigrams = dict(self._trigrams)
+            for trigram, ids in added_trigrams.items():
+                index._trigrams[trigram] = index._trigrams.get(trigram, set()) | ids
+        index._fragment_cache = {}
+        return index
+
+    def _vocab_matching(self, fragment):
+        """Returns the ids of vocabulary tokens containing fragment."""
+        if fragment in self._fragment_cache:
+            return self._fragment_cache[fragment]
+
+        if len(fragment) < 3:
+            ids = [i for i, token in enumerate(self.vocab) if fragment in token]
+        else:
+            if self._trigrams is None:
+                self._trigrams = {}
+                for i, token in enumerate(self.vocab):
+                    for j in range(len(token) - 2):
+                        self._trigrams.setdefault(token[j:j + 3], set()).add(i)
+            candidates = None
+            for j in range(len(fragment) - 2):
+                postings = self._trigrams.get(fragment[j:j + 3], set())
+                candidates = postings if candidates is None else candidates & postings
+                if not candidates:
+                    break
+            ids = sorted(i for i in candidates if fragment in self.vocab[i])
+
+        if len(self._fragment_cache) >= 1024:
+            self._fragment_cache.clear()
+        self._fragment_cache[fragment] = np.asarray(ids, dtype=np.int64)
+        return self._fragment_cache[fragment]
+
+    def _term_frequencies(self, fragment, col_code):
+        """Returns per-row occurrence counts of tokens containing fragment."""
+        ids = self._vocab_matching(fragment)
+        if len(ids) == 0:
+            return np.zeros(self.n_rows)
+        idx = np.concatenate([np.arange(self._offsets[i], self._offsets[i + 1]) for i in ids])
+        rows, tf = self._rows[idx], self._tf[idx]
+        if col_code is not None:
+            in_column = self._cols[idx] == col_code
+            rows, tf = rows[in_column], tf[in_column]
+        return np.bincount(rows, weights=tf, minlength=self.n_rows)
+
+    def _contains(self, term, candidates, col_code):
+        """Returns a row mask of candidates whose raw text contains term."""
+        positions = np.flatnonzero(candidates)
+        hits = np.zeros(self.n_rows, dtype=bool)
+        codes = range(len(self.columns)) if col_code is None else [col_code]
+        for code in codes:
+            found = pd.Series(self._text[code][positions]).str.contains(term, regex=False).to_numpy()
+            hits[positions[found]] = True
+        return hits
+
+    def search(self, query, column=None):
+        """Returns positions of rows matching every term of query, best match first.
+
+        Terms are whitespace separated (double quotes keep a phrase together) and
+        match case-insensitively as substrings, like the previous str.contains search.
+        """
+        terms = [quoted or bare for quoted, bare in SEARCH_QUERY_RE.findall(query.lower())]
+        if not terms:
+            return np.arange(self.n_rows)
+
+        col_code = None if column is None else self._col_codes[column]
+        doc_len = self._row_len if col_code is None else self._cell_len[col_code]
+        avg_len = doc_len.mean() if self.n_rows and doc_len.mean() > 0 else 1.0
+
+        matched = np.ones(self.n_rows, dtype=bool)
+        scores = np.zeros(self.n_rows)
+        for term in terms:
+            fragments = re.findall(SEARCH_TOKEN_PATTERN, term)
+            if fragments:
+                tf = None
+                for fragment in fragments:
+                    counts = self._term_frequencies(fragment, col_code)
+                    tf = counts if tf is None else np.minimum(tf, counts)
+                term_mask = tf > 0
+                if fragments != [term]:
+                    # Terms spanning punctuation or several tokens are confirmed against the raw text
+                    term_mask &= self._contains(term, term_mask, col_code)
+            else:
+                term_mask = self._contains(term, matched, col_code)
+                tf = term_mask.astype(np.float64)
+
+            matched &= term_mask
+            n_matching = term_mask.sum()
+            idf = np.log(1 + (self.n_rows - n_matching + 0.5) / (n_matching + 0.5))
+            k1, b = self.BM25_K1, self.BM25_B
+            scores += idf * tf * (k1 + 1) / (tf + k1 * (1 - b + b * doc_len / avg_len))
+
+        positions = np.flatnonzero(matched)
+        return positions[np.argsort(-scores[positions], kind="stable")]
+
+
+def get_search_index(df, sheet_id, worksheet_name):
+    """Returns the search index of df's dataset version, extending the previous version's after an append."""
+    return get_artifact(("search_index", sheet_id, worksheet_name), df, SearchIndex, SearchIndex.extended)
+
+# --- Typed Schema Inference ---
+
+# Tried in order on a sample of each text column; the first format parsing enough of it wins
+DATETIME_FORMATS = [
+    "%Y-%m-%d %H:%M:%S",
+    "%Y-%m-%dT%H:%M:%S",
+    "%Y-%m-%d %H:%M",
+    "%Y-%m-%d",
+    "%m/%d/%Y %H:%M:%S",
+    "%m/%d/%Y %H:%M",
+    "%m/%d/%Y",
+    "%d/%m/%Y %H:%M:%S",
+    "%d/%m/%Y",
+    "%d.%m.%Y",
+    "%B %d, %Y",
+]
+
+
+@dataclass
+class ColumnSchema:
+    """Inferred type of one column: numeric, datetime (with its format), categorical, url or text."""
+    kind: str
+    format: str = None
+
+
+def infer_column_schema(series):
+    """Infers a column's type from an evenly spaced sample of its non-empty values."""
+    values = series[series.notna()].astype(str).str.strip()
+    values = values[values != ""]
+    if values.empty:
+        return ColumnSchema("text")
+
+    step = max(len(values) // SCHEMA_SAMPLE_SIZE, 1)
+    sample = values.iloc[::step].iloc[:SCHEMA_SAMPLE_SIZE]
+
+    if pd.to_numeric(sample, errors="coerce").notna().mean() >= SCHEMA_MATCH_RATIO:
+        return ColumnSchema("numeric")
+    for fmt in DATETIME_FORMATS:
+        if pd.to_datetime(sample, format=fmt, errors="coerce").notna().mean() >= SCHEMA_MATCH_RATIO:
+            return ColumnSchema("datetime", fmt)
+    if sample.str.match(r"https?://", case=False).mean() >= SCHEMA_MATCH_RATIO:
+        return ColumnSchema("url")
+
+    unique_count = values.nunique()
+    if unique_count <= CATEGORICAL_MAX_UNIQUE and unique_count <= len(values) // 2:
+        return ColumnSchema("categorical")
+    return ColumnSchema("text")
+
+
+def convert_column(series, column_schema):
+    """Converts a column to its inferred type with a single vectorized parse."""
+    if column_schema.kind == "numeric":
+        return pd.to_numeric(series, errors="coerce")
+    if column_schema.kind == "datetime":
+        return pd.to_datetime(series.astype(str).str.strip(), format=column_schema.format, errors="coerce")
+    if column_schema.kind == "categorical":
+        return series.astype(str).astype("category")
+    return series
+
+# --- Filter Expressions ---
+
+FILTER_TOKEN_RE = re.compile(
+    r'\s*(?:(?P<lparen>\()|(?P<rparen>\))|(?P<op>>=|<=|!=|=|>|<)'
+    r'|"(?P<string>(?:[^"\\]|\\.)*)"|`(?P<column>[^`]+)`|(?P<word>[^\s()=!<>"`]+))'
+)
+FILTER_DATE_RE = re.compile(r"^\d{4}-\d{1,2}(-\d{1,2})?([ T]\d{1,2}:\d{2}(:\d{2})?)?$")
+
+
+class FilterSyntaxError(ValueError):
+    """Raised when a filter expression cannot be parsed or refers to unknown columns."""
+
+
+def tokenize_filter(expression):
+    """Splits a filter expression into (kind, text) tokens."""
+    tokens = []
+    pos = 0
+    expression = expression.rstrip()
+    while pos < len(expression):
+        match = FILTER_TOKEN_RE.match(expression, pos)
+        if not match or match.end() == pos:
+            raise FilterSyntaxError(f"Unexpected character at position {pos + 1}: '{expression[pos:].strip()[:10]}'")
+        kind = match.lastgroup
+        text = match.group(kind)
+        if kind == "string":
+            text = re.sub(r"\\(.)", r"\1", text)
+        elif kind == "word" and text.upper() in ("AND", "OR", "NOT", "HAS"):
+            kind, text = "keyword", text.upper()
+        tokens.append((kind, text))
+        pos = match.end()
+    return tokens
+
+
+@functools.lru_cache(maxsize=256)
+def parse_filter(expression):
+    """Parses a filter expression into a nested tuple tree.
+
+    Grammar (keywords are case-insensitive, AND binds tighter than OR):
+        expr       := term ("OR" term)*
+        term       := factor ("AND" factor)*
+        factor     := "NOT" factor | "(" expr ")" | comparison
+        comparison := column ("=" | "!=" | "<" | "<=" | ">" | ">=" | "has") value
+    Columns are bare words or `backtick quoted`; values are bare words or "double quoted".
+    """
+    tokens = tokenize_filter(expression)
+    pos = 0
+
+    def peek():
+        return tokens[pos] if pos < len(tokens) else (None, None)
+
+    def take():
+        nonlocal pos
+        if pos >= len(tokens):
+            raise FilterSyntaxError("Unexpected end of expression")
+        pos += 1
+        return tokens[pos - 1]
+
+    def parse_or():
+        node = parse_and()
+        while peek() == ("keyword", "OR"):
+            take()
+            node = ("or", node, parse_and())
+        return node
+
+    def parse_and():
+        node = parse_not()
+        while peek() == ("keyword", "AND"):
+            take()
+            node = ("and", node, parse_not())
+        return node
+
+    def parse_not():
+        kind, text = peek()
+        if (kind, text) == ("keyword", "NOT"):
+            take()
+            return ("not", parse_not())
+        if kind == "lparen":
+            take()
+            node = parse_or()
+            if take()[0] != "rparen":
+                raise FilterSyntaxError("Missing closing parenthesis")
+            return node
+        return parse_comparison()
+
+    def parse_comparison():
+        kind, column = take()
+        if kind not in ("word", "column", "string"):
+            raise FilterSyntaxError(f"Expected a column name, found '{column}'")
+        kind, op = take()
+        if kind == "keyword" and op == "HAS":
+            op = "has"
+        elif kind != "op":
+            raise FilterSyntaxError(f"Expected an operator after '{column}', found '{op}'")
+        kind, value = take()
+        if kind not in ("word", "string"):
+            raise FilterSyntaxError(f"Expected a value after '{column} {op}', found '{value}'")
+        return ("cmp", column, op, value)
+
+    if not tokens:
+        raise FilterSyntaxError("Empty expression")
+    tree = parse_or()
+    if pos != len(tokens):
+        raise FilterSyntaxError(f"Unexpected '{tokens[pos][1]}' after complete expression")
+    return tree
+
+
+class TypedColumns:
+    """Typed form of one dataset version: inferred schema, converted frame and filter evaluation.
+
+    Every column is converted once, with vectorized parsers, to its inferred
+    type. Filters comparing a column as another type get lazily converted
+    views, which are cached too.
+    """
+
+    def __init__(self, df):
+        self.df = df
+        self.schema = {column: infer_column_schema(df[column]) for column in df.columns}
+        self.frame = pd.DataFrame(
+            {column: convert_column(df[column], self.schema[column]) for column in df.columns},
+            index=df.index
+        )
+        self._views = {}
+        self._masks = {}
+
+    def extended(self, df):
+        """Returns the typed form of df, converting only the rows after the ones converted here.
+
+        Appended rows keep the inferred schema, as rows outside a full build's
+        sample do; a categorical column outgrowing CATEGORICAL_MAX_UNIQUE
+        rebuilds from scratch instead.
+        """
+        added = df.iloc[len(self.df):]
+        columns = {}
+        for column in df.columns:
+            converted = convert_column(added[column], self.schema[column])
+            if self.schema[column].kind == "categorical":
+                converted = pd.api.types.union_categoricals([self.frame[column], converted], sort_categories=True)
+                if len(converted.categories) > CATEGORICAL_MAX_UNIQUE:
+                    return TypedColumns(df)
+                converted = pd.Series(converted, index=df.index, name=column)
+            else:
+                converted = pd.concat([self.frame[column], converted])
+            columns[column] = converted
+        typed = TypedColumns.__new__(TypedColumns)
+        typed.df = df
+        typed.schema = self.schema
+        typed.frame = pd.DataFrame(columns, index=df.index)
+        typed._views = {}
+        typed._masks = {}
+        return typed
+
+    def datetimes(self, column):
+        """Returns column as datetimes (NaT where unparseable), whatever type it was inferred as."""
+        if self.schema[column].kind == "datetime":
+            return self.frame[column]
+        key = (column, "datetime_series")
+        if key not in self._views:
+            self._views[key] = pd.to_datetime(self.df[column], errors="coerce", format="mixed")
+        return self._views[key]
+
+    def sort_values(self, column):
+        """Returns column as an array ordered by its inferred type (text case-insensitively)."""
+        kind = self.schema[column].kind
+        return self._view(column, kind if kind in ("numeric", "datetime") else "text")
+
+    def _view(self, column, kind):
+        key = (column, kind)
+        if key not in self._views:
+            series = self.df[column]
+            if kind == self.schema[column].kind and kind in ("numeric", "datetime"):
+                view = self.frame[column].to_numpy()
+            elif kind == "numeric":
+                view = pd.to_numeric(series, errors="coerce").to_numpy(dtype=np.float64)
+            elif kind == "datetime":
+                view = self.datetimes(column).to_numpy()
+            else:
+                view = series.astype(str).str.strip().str.lower().to_numpy(dtype=object)
+            self._views[key] = view
+        return self._views[key]
+
+    def _compare(self, column, op, value):
+        if column not in self.df.columns:
+            raise FilterSyntaxError(f"Unknown column '{column}'")
+
+        if op == "has":
+            text = pd.Series(self._view(column, "text"))
+            return text.str.contains(value.lower(), regex=False).to_numpy()
+        if op == "!=":
+            return ~self._compare(column, "=", value)
+
+        try:
+            operand, kind = float(value), "numeric"
+        except ValueError:
+            if FILTER_DATE_RE.match(value):
+                try:
+                    operand, kind = np.datetime64(pd.Timestamp(value)), "datetime"
+                except ValueError:
+                    raise FilterSyntaxError(f"invalid date {value!r}") from None
+            else:
+                operand, kind = value.strip().lower(), "text"
+
+        view = self._view(column, kind)
+        if kind == "text":
+            view = view.astype(str)
+        if op == "=":
+            return view == operand
+        if op == "<":
+            return view < operand
+        if op == "<=":
+            return view <= operand
+        if op == ">":
+            return view > operand
+        return view >= operand
+
+    def _evaluate(self, node):
+        if node[0] == "and":
+            return self._evaluate(node[1]) & self._evaluate(node[2])
+        if node[0] == "or":
+            return self._evaluate(node[1]) | self._evaluate(node[2])
+        if node[0] == "not":
+            return ~self._evaluate(node[1])
+        return self._compare(*node[1:])
+
+    def mask(self, expression):
+        """Returns a boolean row mask for a filter expression, memoized per expression."""
+        if expression not in self._masks:
+            if len(self._masks) >= 64:
+                self._masks.clear()
+            self._masks[expression] = np.asarray(self._evaluate(parse_filter(expression)), dtype=bool)
+        return self._masks[expression]
+
+
+def get_typed_columns(df, sheet_id, worksheet_name):
+    """Returns the typed form of df, cached per dataset version unless df is an unversioned window page."""
+    return get_artifact(("typed_columns", sheet_id, worksheet_name), df, TypedColumns, TypedColumns.extended)
+
+# --- Incremental Analytics Aggregates ---
+
+class DatasetAggregates:
+    """Analytics counters for one worksheet, maintained across dataset versions.
+
+    When a new version only appends rows to the one already aggregated (a
+    write-through append, or a refresh whose leading rows hash identically),
+    only the new rows are counted; any other change rebuilds from scratch.
+    """
+
+    def __init__(self):
+        self.version = None
+        self.columns = []
+        self.n_rows = 0
+        self.row_hashes = np.empty(0, dtype=np.uint64)
+        self.value_counts = {}  # column -> Counter of non-null values
+        self.null_counts = {}  # column -> number of null cells
+        self.daily_counts = Counter()  # date -> rows with that Timestamp date
+        self.valid_videos = {}  # video column -> rows with a valid video URL, once requested
+        self._lock = threading.Lock()
+
+    def sync(self, df, sheet_id, worksheet_name):
+        """Brings the counters up to date with df's dataset version."""
+        with self._lock:
+            version = df.attrs.get("dataset_version")
+            if version is not None and version == self.version:
+                return
+
+            appended = list(df.columns) == self.columns and len(df) >= self.n_rows and self.version is not None
+            if appended and df.attrs.get("parent_version") != self.version:
+                prefix = pd.util.hash_pandas_object(df.iloc[:self.n_rows], index=False).to_numpy()
+                appended = np.array_equal(prefix, self.row_hashes)
+            if not appended:
+                self._reset(list(df.columns))
+            self._add(df.iloc[self.n_rows:], get_typed_columns(df, sheet_id, worksheet_name))
+            self.version = version
+
+    def _reset(self, columns):
+        self.columns = columns
+        self.n_rows = 0
+        self.row_hashes = np.empty(0, dtype=np.uint64)
+        self.value_counts = {column: Counter() for column in columns}
+        self.null_counts = {column: 0 for column in columns}
+        self.daily_counts = Counter()
+        self.valid_videos = {video_col_name: 0 for video_col_name in self.valid_videos}
+
+    def _add(self, rows, typed):
+        if rows.empty:
+            return
+        for column in self.columns:
+            counts = rows[column].value_counts(dropna=True)
+            self.value_counts[column].update(dict(zip(counts.index, counts.to_numpy().tolist())))
+            self.null_counts[column] += int(rows[column].isna().sum())
+        if "Timestamp" in self.columns:
+            dates = typed.datetimes("Timestamp").loc[rows.index].dropna().dt.date.value_counts()
+            self.daily_counts.update(dict(zip(dates.index, dates.to_numpy().tolist())))
+        for video_col_name in self.valid_videos:
+            self.valid_videos[video_col_name] += int(derive_video_columns(rows[video_col_name])["is_valid"].sum())
+        self.row_hashes = np.concatenate([
+            self.row_hashes, pd.util.hash_pandas_object(rows, index=False).to_numpy()
+        ])
+        self.n_rows += len(rows)
+
+    def valid_video_count(self, df, sheet_id, worksheet_name, video_col_name):
+        """Returns rows with a valid video URL, counting the column in full only the first time."""
+        with self._lock:
+            if video_col_name not in self.valid_videos:
+                video_info = get_video_columns(df, sheet_id, worksheet_name, video_col_name)
+                self.valid_videos[video_col_name] = int(video_info["is_valid"].iloc[:self.n_rows].sum())
+            return self.valid_videos[video_col_name]
+
+    def non_null(self, column):
+        return self.n_rows - self.null_counts[column]
+
+    def unique(self, column):
+        return len(self.value_counts[column])
+
+    def duplicates(self, column):
+        """Returns rows repeating an earlier row's value, as df.duplicated(subset=[column]).sum() would."""
+        repeated = sum(count - 1 for count in self.value_counts[column].values())
+        return repeated + max(self.null_counts[column] - 1, 0)
+
+    def completeness(self):
+        total_cells = self.n_rows * len(self.columns)
+        filled_cells = sum(self.non_null(column) for column in self.columns)
+        return (filled_cells / total_cells * 100) if total_cells > 0 else 0
+
+    def daily_frame(self):
+        """Returns entries per date as a Date/Count frame in date order."""
+        return pd.DataFrame(sorted(self.daily_counts.items()), columns=['Date', 'Count'])
+
+    def value_counts_frame(self, column):
+        """Returns a column's value counts, most frequent first, like Series.value_counts()."""
+        return pd.DataFrame(self.value_counts[column].most_common(), columns=[column, 'Count'])
+
+
+@st.cache_resource
+def get_aggregate_store():
+    """Returns the per-worksheet analytics aggregates shared by all sessions."""
+    return {}
+
+
+def get_aggregates(df, sheet_id, worksheet_name):
+    """Returns analytics aggregates synced to df's dataset version."""
+    if df.attrs.get("dataset_version") is None:
+        aggregates = DatasetAggregates()
+    else:
+        aggregates = get_aggregate_store().setdefault((sheet_id, worksheet_name), DatasetAggregates())
+    aggregates.sync(df, sheet_id, worksheet_name)
+    return aggregates
+
+# --- Column Profiler ---
+
+class DatasetProfile:
+    """Per-column profile of one dataset version: type, counts, distinct values, lengths and top values.
+
+    Each column is profiled with whole-array operations: distinct and top values
+    come from hashing the non-null values once and counting the unique hashes.
+    The unique hashes are kept, so a version appending rows is profiled by
+    hashing only the new rows and merging their counts.
+    """
+
+    TOP_VALUES = 5
+
+    def __init__(self, df, schema, version=None):
+        self.version = version
+        self.n_rows = len(df)
+        self.generated_at = datetime.now().isoformat(timespec="seconds")
+        self._hashes = {}  # column -> (sorted unique value hashes, their counts, row of each one's first occurrence)
+        self.columns = [self._profile_column(column, df[column].to_numpy(), schema[column]) for column in df.columns]
+
+    def extended(self, df, schema):
+        """Returns the profile of df, hashing only the rows after the ones profiled here."""
+        profile = DatasetProfile.__new__(DatasetProfile)
+        profile.version = df.attrs.get("dataset_version")
+        profile.n_rows = len(df)
+        profile.generated_at = datetime.now().isoformat(timespec="seconds")
+        profile._hashes = {}
+        profile.columns = [
+            profile._profile_column(column, df[column].to_numpy(), schema[column], previous, self._hashes[column])
+            for column, previous in zip(df.columns, self.columns)
+        ]
+        return profile
+
+    def _profile_column(self, column, values, column_schema, previous=None, previous_hashes=None):
+        first_row = 0 if previous is None else previous["null"] + previous["non_null"]
+        nulls = pd.isna(values[first_row:])
+        present = values[first_row:][~nulls]
+        profile = {
+            "column": column,
+            "type": column_schema.kind,
+            "non_null": int(len(present)),
+            "null": int(nulls.sum()),
+            "distinct": 0,
+            "min_length": None,
+            "max_length": None,
+            "top_values": [],
+        }
+
+        hashes = pd.util.hash_array(present)
+        unique_hashes, first_index, counts = np.unique(hashes, return_index=True, return_counts=True)
+        first_rows = np.flatnonzero(~nulls)[first_index] + first_row
+        if len(present):
+            lengths = pd.Series(present).astype(str).str.len().to_numpy()
+            profile["min_length"] = int(lengths.min())
+            profile["max_length"] = int(lengths.max())
+
+        if previous is not None:
+            profile["non_null"] += previous["non_null"]
+            profile["null"] += previous["null"]
+            for key, pick in (("min_length", min), ("max_length", max)):
+                known = [length for length in (previous[key], profile[key]) if length is not None]
+                profile[key] = pick(known) if known else None
+            # Earlier rows come first, so each hash keeps the row of its first occurrence
+            all_hashes = np.concatenate([previous_hashes[0], unique_hashes])
+            all_counts = np.concatenate([previous_hashes[1], counts])
+            all_rows = np.concatenate([previous_hashes[2], first_rows])
+            unique_hashes, first_index, inverse = np.unique(all_hashes, return_index=True, return_inverse=True)
+            counts = np.bincount(inverse, weights=all_counts, minlength=len(unique_hashes)).astype(np.int64)
+            first_rows = all_rows[first_index]
+        self._hashes[column] = (unique_hashes, counts, first_rows)
+
+        profile["distinct"] = int(len(unique_hashes))
+        top = np.argsort(-counts, kind="stable")[:self.TOP_VALUES]
+        profile["top_values"] = [
+            {"value": getattr(values[first_rows[i]], "item", lambda: values[first_rows[i]])(), "count": int(counts[i])}
+            for i in top
+        ]
+        return profile
+
+    def table(self):
+        """Returns the profile as the Column Statistics table."""
+        return pd.DataFrame([{
+            'Column': p["column"],
+            'Type': p["type"],
+            'Non-Empty': p["non_null"],
+            'Empty': p["null"],
+            'Unique Values': p["distinct"],
+            'Completeness': f"{(p['non_null'] / self.n_rows * 100) if self.n_rows else 0:.1f}%",
+            'Min Length': p["min_length"],
+            'Max Length': p["max_length"],
+            'Top Values': ", ".join(f"{v['value']} ({v['count']})" for v in p["top_values"]),
+        } for p in self.columns])
+
+    def to_json(self, sheet_id, worksheet_name):
+        """Serializes the profile for data-quality monitoring."""
+        return json.dumps({
+            "sheet_id": sheet_id,
+            "worksheet": worksheet_name,
+            "dataset_version": self.version,
+            "generated_at": self.generated_at,
+            "rows": self.n_rows,
+            "columns": self.columns,
+        }, indent=2, default=str)
+
+
+def get_profile(df, sheet_id, worksheet_name):
+    """Returns the column profile of df, cached per dataset version unless df is an unversioned window page."""
+    schema = lambda df: get_typed_columns(df, sheet_id, worksheet_name).schema
+    return get_artifact(
+        ("profile", sheet_id, worksheet_name), df,
+        lambda df: DatasetProfile(df, schema(df), df.attrs.get("dataset_version")),
+        lambda profile, df: profile.extended(df, schema(df)),
+    )
+
+# --- Write-Behind Append Queue ---
+
+class AppendQueue:
+    """Write-behind queue shared by all sessions that coalesces sheet appends.
+
+    Rows submitted for the same worksheet within one flush interval are written
+    with a single append_rows call. Each submission gets a Future that resolves
+    once its batch is written, or fails after max_attempts unsuccessful flushes.
+    """
+
+    def __init__(self, flush_interval=APPEND_FLUSH_INTERVAL, max_attempts=APPEND_MAX_ATTEMPTS, on_flushed=None):
+        self.flush_interval = flush_interval
+        self.max_attempts = max_attempts
+        self.on_flushed = on_flushed
+        self._pending = {}  # (gc, sheet_id, worksheet_name) -> list of [values, future, attempts]
+        self._cond = threading.Condition()
+        self._thread = None
+
+    def submit(self, gc, sheet_id, worksheet_name, values):
+        """Queues one row for appending and returns a Future acknowledging it."""
+        future = Future()
+        with self._cond:
+            self._pending.setdefault((gc, sheet_id, worksheet_name), []).append([values, future, 0])
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._run, name="append-queue", daemon=True)
+                self._thread.start()
+            self._cond.notify()
+        return future
+
+    def depth(self):
+        """Returns the number of rows waiting to be written."""
+        with self._cond:
+            return sum(len(items) for items in self._pending.values())
+
+    def _run(self):
+        delay = self.flush_interval
+        while True:
+            with self._cond:
+                while not self._pending:
+                    self._cond.wait()
+            # Let concurrent submissions accumulate into the same batch
+            time.sleep(delay)
+            with self._cond:
+                batches, self._pending = self._pending, {}
+            failed = False
+            for key, items in batches.items():
+                failed |= not self._flush(key, items)
+            delay = min(delay * 2, 30) if failed else self.flush_interval
+
+    def _flush(self, key, items):
+        gc, sheet_id, worksheet_name = key
+        try:
+            worksheet = get_metadata_cache().get(gc, sheet_id).worksheet(worksheet_name)
+            response = worksheet.append_rows([values for values, _, _ in items])
+        except Exception as e:
+            if isinstance(e, WorksheetNotFound):
+                # The tab may have been renamed since the metadata was cached
+                get_metadata_cache().invalidate(sheet_id)
+            retry = []
+            for item in items:
+                item[2] += 1
+                if item[2] >= self.max_attempts:
+                    item[1].set_exception(e)
+                else:
+                    retry.append(item)
+            if retry:
+                with self._cond:
+                    self._pending[key] = retry + self._pending.get(key, [])
+            return False
+
+        # Write the rows through before acknowledging them, so a session that reruns on the
+        # acknowledgement already reads them from the cache
+        if self.on_flushed is not None:
+            try:
+                self.on_flushed(sheet_id, worksheet_name, [values for values, _, _ in items])
+            except Exception:
+                # Cache maintenance must never stop the writer thread; stale data expires on its own
+                logger.exception("Writing appended rows through to %s/%s failed", sheet_id, worksheet_name)
+        for _, future, _ in items:
+            future.set_result(response)
+        return True
+
+
+def on_rows_appended(sheet_id, worksheet_name, rows):
+    """Writes rows the append queue has written through to the cached copies of their worksheet.
+
+    Runs under the snapshot writer lock, so a background refresh that started
+    before the append cannot overwrite the extended snapshot with older rows.
+    """
+    get_row_window_cache().invalidate(sheet_id, worksheet_name)
+    cache, store = get_dataset_cache(), get_snapshot_store()
+    with store.writer_lock(sheet_id, worksheet_name):
+        snapshot = cache.append_rows(sheet_id, worksheet_name, rows)
+        if snapshot is None:
+            invalidate_dataset(sheet_id, worksheet_name)
+            return
+        stored = store.write(
+            sheet_id, worksheet_name, snapshot.df, fetched_at=snapshot.fetched_at, version=snapshot.version
+        )
+        # Serve the frame as stored, so this process sees the same dtypes as one reading the snapshot
+        cache.replace(
+            sheet_id, worksheet_name, replace(stored, parent_version=snapshot.parent_version),
+            expected_version=snapshot.version
+        )
+
+
+@st.cache_resource
+def get_append_queue():
+    """Returns the write-behind append queue shared by all sessions."""
+    return AppendQueue(on_flushed=on_rows_appended)
+
+
+def show_append_acknowledgements():
+    """Reports this session's queued sheet appends as the write-behind queue acknowledges them."""
+    pending = st.session_state.get("pending_appends", [])
+    acknowledged = st.session_state.setdefault("acknowledged_appends", [])
+
+    still_pending = []
+    for entry in pending:
+        if entry["future"].done():
+            acknowledged.insert(0, entry)
+        else:
+            still_pending.append(entry)
+    st.session_state["pending_appends"] = still_pending
+    del acknowledged[5:]
+
+    for entry in still_pending:
+        st.info(f"⏳ Writing **{entry['title'] or 'untitled entry'}** to **{entry['worksheet']}**...")
+    for entry in acknowledged:
+        error = entry["future"].exception()
+        if error is not None:
+            st.error(f"❌ Failed to append **{entry['title'] or 'untitled entry'}** to **{entry['worksheet']}**: {str(error)}")
+        else:
+            st.success(f"✅ **{entry['title'] or 'untitled entry'}** was added to worksheet **{entry['worksheet']}**")
+
+    if pending and not still_pending:
+        # Everything is acknowledged: rerun the whole app to show the new rows and stop polling
+        st.rerun()
+
+# --- Webhook Outbox ---
+
+class WebhookOutbox:
+    """Durable SQLite outbox for webhook deliveries, drained by a background dispatcher.
+
+    Deliveries are claimed by pushing next_attempt_at past a lease, so several
+    server processes can share one outbox file and a crashed dispatcher's
+    claims simply become due again. Failed deliveries back off exponentially
+    and are dead-lettered after WEBHOOK_MAX_ATTEMPTS or a non-retryable status.
+    """
+
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS outbox (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            url TEXT NOT NULL,
+            payload TEXT NOT NULL,
+            status TEXT NOT NULL DEFAULT 'pending',
+            attempts INTEGER NOT NULL DEFAULT 0,
+            next_attempt_at REAL NOT NULL,
+            created_at REAL NOT NULL,
+            delivered_at REAL,
+            last_error TEXT
+        );
+        CREATE INDEX IF NOT EXISTS outbox_due ON outbox (status, next_attempt_at);
+    """
+
+    def __init__(self, path):
+        self.path = path
+        make_private_dir(os.path.dirname(path))
+        # SQLite creates the -wal and -shm files with the database file's permissions
+        os.close(os.open(path, os.O_RDWR | os.O_CREAT, 0o600))
+        os.chmod(path, 0o600)
+        with self._connect() as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.executescript(self.SCHEMA)
+
+        self.session = requests.Session()
+        adapter = requests.adapters.HTTPAdapter(pool_connections=WEBHOOK_CONCURRENCY, pool_maxsize=WEBHOOK_CONCURRENCY)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+        self.session.headers["Content-Type"] = "application/json"
+
+        self._executor = ThreadPoolExecutor(max_workers=WEBHOOK_CONCURRENCY, thread_name_prefix="webhook")
+        self._wakeup = threading.Event()
+        self._thread_lock = threading.Lock()
+        self._thread = None
+        self._ensure_dispatcher()
+
+    def _ensure_dispatcher(self):
+        """Starts the dispatcher thread unless it is running."""
+        with self._thread_lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._run, name="webhook-dispatcher", daemon=True)
+                self._thread.start()
+
+    @contextmanager
+    def _connect(self):
+        conn = sqlite3.connect(self.path, timeout=10)
+        try:
+            with conn:
+                yield conn
+        finally:
+            conn.close()
+
+    def enqueue(self, url, payload):
+        """Durably records a delivery and wakes the dispatcher."""
+        now = time.time()
+        with self._connect() as conn:
+            conn.execute(
+                "INSERT INTO outbox (url, payload, next_attempt_at, created_at) VALUES (?, ?, ?, ?)",
+                (url, json.dumps(payload), now, now)
+            )
+        self._ensure_dispatcher()
+        self._wakeup.set()
+
+    def stats(self):
+        """Returns queue depth, dead letters and recent delivery latency."""
+        with self._connect() as conn:
+            counts = dict(conn.execute("SELECT status, COUNT(*) FROM outbox GROUP BY status").fetchall())
+            latencies = [row[0] for row in conn.execute(
+                "SELECT delivered_at - created_at FROM outbox WHERE status = 'delivered' "
+                "ORDER BY delivered_at DESC LIMIT 100"
+            )]
+        latencies.sort()
+        return {
+            "pending": counts.get("pending", 0),
+            "delivered": counts.get("delivered", 0),
+            "dead": counts.get("dead", 0),
+            "latency_p50": latencies[len(latencies) // 2] if latencies else None,
+            "latency_p95": latencies[int(len(latencies) * 0.95)] if latencies else None,
+        }
+
+    def _claim(self, limit):
+        now = time.time()
+        with self._connect() as conn:
+            conn.execute("BEGIN IMMEDIATE")
+            rows = conn.execute(
+                "SELECT id, url, payload, attempts FROM outbox "
+                "WHERE status = 'pending' AND next_attempt_at <= ? ORDER BY next_attempt_at LIMIT ?",
+                (now, limit)
+            ).fetchall()
+            conn.executemany(
+                "UPDATE outbox SET next_attempt_at = ? WHERE id = ?",
+                [(now + WEBHOOK_LEASE, row[0]) for row in rows]
+            )
+        return rows
+
+    def _deliver(self, row):
+        delivery_id, url, payload, attempts = row
+        retryable = True
+        try:
+            response = self.session.post(url, data=payload, timeout=10)
+            if 200 <= response.status_code < 300:
+                with self._connect() as conn:
+                    conn.execute(
+                        "UPDATE outbox SET status = 'delivered', delivered_at = ?, attempts = ?, last_error = NULL "
+                        "WHERE id = ?",
+                        (time.time(), attempts + 1, delivery_id)
+                    )
+                return
+            error = f"HTTP {response.status_code}: {response.text[:200]}"
+            retryable = response.status_code in (408, 429) or response.status_code >= 500
+        except requests.exceptions.RequestException as e:
+            error = str(e)
+
+        attempts += 1
+        status = "pending" if retryable and attempts < WEBHOOK_MAX_ATTEMPTS else "dead"
+        backoff = min(WEBHOOK_BACKOFF_BASE * 2 ** (attempts - 1), WEBHOOK_BACKOFF_MAX)
+        with self._connect() as conn:
+            conn.execute(
+                "UPDATE outbox SET status = ?, attempts = ?, last_error = ?, next_attempt_at = ? WHERE id = ?",
+                (status, attempts, error, time.time() + backoff * random.uniform(0.5, 1.0), delivery_id)
+            )
+
+    def _run(self):
+        while True:
+            try:
+                rows = self._claim(WEBHOOK_CONCURRENCY)
+                if rows:
+                    list(self._executor.map(self._deliver, rows))
+                    continue
+                with self._connect() as conn:
+                    conn.execute(
+                        "DELETE FROM outbox WHERE status = 'delivered' AND delivered_at < ?",
+                        (time.time() - WEBHOOK_RETENTION,)
+                    )
+            except sqlite3.Error:
+                pass  # e.g. another process holding the write lock; retried on the next poll
+            except Exception:
+                # Claimed deliveries become due again once their lease expires
+                logger.exception("Webhook dispatch failed")
+            # Poll as well as wait, since other processes may enqueue into the same file
+            self._wakeup.wait(timeout=1.0)
+            self._wakeup.clear()
+
+
+@st.cache_resource
+def get_webhook_outbox():
+    """Returns the process-wide webhook outbox and starts its dispatcher."""
+    return WebhookOutbox(WEBHOOK_OUTBOX_PATH)
+
+# --- Background Tab Prefetch ---
+
+class TabPrefetcher:
+    """Loads a spreadsheet's other tabs in the background so switching tabs hits the cache.
+
+    A tab that fails to load (e.g. a blank or duplicated header) is not tried
+    again until its backoff expires, doubling with every failure.
+    """
+
+    def __init__(self, retry_base=PREFETCH_RETRY_BASE, retry_max=PREFETCH_RETRY_MAX):
+        self.retry_base = retry_base
+        self.retry_max = retry_max
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="tab-prefetch")
+        self._in_flight = set()
+        self._failures = {}  # (sheet_id, worksheet_name) -> (retry_at, consecutive failures)
+        self._lock = threading.Lock()
+
+    def schedule(self, gc, sheet_id, worksheet_names):
+        """Queues one batched load of every listed worksheet that is not cached, queued or backing off."""
+        cache, now = get_dataset_cache(), time.time()
+        with self._lock:
+            missing = [
+                name for name in worksheet_names
+                if (sheet_id, name) not in self._in_flight
+                and self._failures.get((sheet_id, name), (0, 0))[0] <= now
+                and cache.get(sheet_id, name) is None
+            ]
+            if not missing:
+                return
+            self._in_flight.update((sheet_id, name) for name in missing)
+        self._executor.submit(self._prefetch, gc, sheet_id, missing)
+
+    def _prefetch(self, gc, sheet_id, worksheet_names):
+        try:
+            try:
+                load_worksheets_batch(gc, sheet_id, worksheet_names)
+                loaded = worksheet_names
+            except Exception:
+                # One bad tab fails the whole batch: load the tabs one by one to find it
+                loaded = []
+                if len(worksheet_names) > 1:
+                    for name in worksheet_names:
+                        try:
+                            load_worksheets_batch(gc, sheet_id, [name])
+                            loaded.append(name)
+                        except Exception:
+                            # Prefetching is best effort; the tab loads normally when selected
+                            pass
+            with self._lock:
+                for name in worksheet_names:
+                    if name in loaded:
+                        self._failures.pop((sheet_id, name), None)
+                    else:
+                        failures = self._failures.get((sheet_id, name), (0, 0))[1] + 1
+                        delay = min(self.retry_base * 2 ** (failures - 1), self.retry_max)
+                        self._failures[(sheet_id, name)] = (time.time() + delay, failures)
+        finally:
+            with self._lock:
+                self._in_flight.difference_update((sheet_id, name) for name in worksheet_names)
+
+
+@st.cache_resource
+def get_tab_prefetcher():
+    """Returns the background tab prefetcher shared by all sessions."""
+    return TabPrefetcher()
+
+# --- Background Dataset Refresh ---
+
+class DatasetRefresher:
+    """Stale-while-revalidate refresher for worksheets that sessions are reading.
+
+    Worksheets read within the hot window are re-fetched shortly before their
+    cached frame expires and swapped in atomically; sessions keep serving the
+    frame they already hold meanwhile. When the spreadsheet's Drive modifiedTime
+    is unchanged since the last fetch, only the fetch time is renewed, so the
+    dataset version (and everything cached for it) stays valid.
+    """
+
+    def __init__(self, ttl=DATASET_CACHE_TTL, lead=REFRESH_LEAD, interval=REFRESH_INTERVAL, hot_window=REFRESH_HOT_WINDOW):
+        self.ttl = ttl
+        self.lead = lead
+        self.interval = interval
+        self.hot_window = hot_window
+        self._hot = {}  # (sheet_id, worksheet_name) -> (gc, last read time)
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+        self._thread = None
+
+    def touch(self, gc, sheet_id, worksheet_name):
+        """Records a read of the worksheet, keeping it on the refresh list."""
+        with self._lock:
+            self._hot[(sheet_id, worksheet_name)] = (gc, time.time())
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._run, name="dataset-refresher", daemon=True)
+                self._thread.start()
+
+    def wake(self):
+        """Starts a refresh scan now instead of at the next interval."""
+        self._wake.set()
+
+    def _run(self):
+        while True:
+            self._wake.wait(self.interval)
+            self._wake.clear()
+            for gc, sheet_id, worksheet_name in self._due():
+                try:
+                    self.refresh(gc, sheet_id, worksheet_name)
+                except Exception:
+                    # The stale frame keeps being served; the next scan retries
+                    pass
+
+    def _due(self):
+        """Returns the hot worksheets whose cached frame expires within the lead time."""
+        now, cache = time.time(), get_dataset_cache()
+        due = []
+        with self._lock:
+            for key, (gc, last_read) in list(self._hot.items()):
+                if now - last_read > self.hot_window:
+                    del self._hot[key]
+                    continue
+                snapshot = cache.get(*key, max_age=DATASET_MAX_STALENESS)
+                if snapshot is not None and now - snapshot.fetched_at >= self.ttl - self.lead:
+                    due.append((gc, *key))
+        return due
+
+    def refresh(self, gc, sheet_id, worksheet_name):
+        """Re-fetches one worksheet unless another process already did, and swaps it into the cache."""
+        cache, store = get_dataset_cache(), get_snapshot_store()
+        current = cache.get(sheet_id, worksheet_name, max_age=DATASET_MAX_STALENESS)
+        if current is None:
+            return
+        with store.writer_lock(sheet_id, worksheet_name):
+            latest = cache.get(sheet_id, worksheet_name, max_age=DATASET_MAX_STALENESS)
+            if latest is None or latest.version != current.version:
+                # Rows were written through meanwhile; the newer frame is refreshed on a later scan
+                return
+            snapshot = store.read(sheet_id, worksheet_name, max_age=self.ttl - self.lead)
+            if snapshot is None:
+                metadata = get_metadata_cache().get(gc, sheet_id)
+                try:
+                    revision = metadata.spreadsheet.get_lastUpdateTime()
+                except Exception:
+                    revision = None  # Drive API unavailable; always re-read the rows
+                if revision is not None and revision == current.revision:
+                    snapshot = store.write(
+                        sheet_id, worksheet_name, current.df, version=current.version, revision=revision
+                    )
+                else:
+                    data = metadata.worksheet(worksheet_name).get_all_records()
+                    snapshot = store.write(sheet_id, worksheet_name, pd.DataFrame(data), revision=revision)
+            cache.replace(sheet_id, worksheet_name, snapshot, expected_version=current.version)
+
+
+@st.cache_resource
+def get_dataset_refresher():
+    """Returns the background dataset refresher shared by all sessions."""
+    return DatasetRefresher()
+
+# --- Windowed Row Loading ---
+
+class RowWindowCache:
+    """Pages of worksheet rows read by A1 row range, for sheets too large to load whole.
+
+    Each read covers the requested page plus WINDOW_READ_AHEAD following pages,
+    and every page is cached on its own so paging forward is usually free.
+    Page frames keep the sheet's row positions as their index.
+    """
+
+    def __init__(self, ttl=DATASET_CACHE_TTL, max_pages=WINDOW_CACHE_MAX_PAGES):
+        self.ttl = ttl
+        self.max_pages = max_pages
+        self._pages = OrderedDict()  # (sheet_id, worksheet_name, page_size, page) -> (fetched_at, frame)
+        self._row_counts = {}  # (sheet_id, worksheet_name) -> (fetched_at, data row count)
+        self._lock = threading.Lock()
+
+    def total_rows(self, gc, sheet_id, worksheet_name):
+        """Returns the worksheet's data row count, read from the filled cells of its first column.
+
+        The grid's row_count includes the empty rows a new sheet starts with,
+        so the values of column A are counted instead; rows whose first cell is
+        empty after the last filled one are not counted.
+        """
+        key = (sheet_id, worksheet_name)
+        with self._lock:
+            cached = self._row_counts.get(key)
+            if cached is not None and time.time() - cached[0] <= self.ttl:
+                return cached[1]
+
+        worksheet = get_metadata_cache().get(gc, sheet_id).worksheet(worksheet_name)
+        count = max(len(worksheet.col_values(1)) - 1, 0)
+        with self._lock:
+            self._row_counts[key] = (time.time(), count)
+        return count
+
+    def get_page(self, gc, sheet_id, worksheet_name, page, page_size):
+        """Returns the frame holding data rows [page * page_size, (page + 1) * page_size)."""
+        key = (sheet_id, worksheet_name, page_size, page)
+        with self._lock:
+            cached = self._pages.get(key)
+            if cached is not None and time.time() - cached[0] <= self.ttl:
+                self._pages.move_to_end(key)
+                return cached[1]
+
+        metadata_cache = get_metadata_cache()
+        worksheet = metadata_cache.get(gc, sheet_id).worksheet(worksheet_name)
+        header = metadata_cache.headers(gc, sheet_id).get(worksheet_name, [])
+
+        # Sheet row 1 is the header, so data row i lives on sheet row i + 2
+        first_row = page * page_size
+        last_page = max((self.total_rows(gc, sheet_id, worksheet_name) - 1) // page_size, page)
+        pages = range(page, min(page + WINDOW_READ_AHEAD, last_page) + 1)
+        values = worksheet.get(f"{first_row + 2}:{first_row + len(pages) * page_size + 1}")
+
+        fetched_at = time.time()
+        with self._lock:
+            for offset, cached_page in enumerate(pages):
+                rows = [list(row) for row in values[offset * page_size:(offset + 1) * page_size]]
+                frame = records_frame([header] + rows) if header else pd.DataFrame()
+                start = cached_page * page_size
+                frame.index = pd.RangeIndex(start, start + len(frame))
+                self._pages[(sheet_id, worksheet_name, page_size, cached_page)] = (fetched_at, frame)
+                self._pages.move_to_end((sheet_id, worksheet_name, page_size, cached_page))
+            while len(self._pages) > self.max_pages:
+                self._pages.popitem(last=False)
+            return self._pages[key][1]
+
+    def invalidate(self, sheet_id, worksheet_name):
+        """Drops every cached page of one worksheet."""
+        with self._lock:
+            for key in [key for key in self._pages if key[:2] == (sheet_id, worksheet_name)]:
+                del self._pages[key]
+            self._row_counts.pop((sheet_id, worksheet_name), None)
+
+
+@st.cache_resource
+def get_row_window_cache():
+    """Returns the row window cache shared by all sessions."""
+    return RowWindowCache()
+
+
+def load_window(_gc, sheet_id, worksheet_name, page, page_size):
+    """Loads one page of rows from the specified worksheet without reading the rest of it."""
+    try:
+        return get_row_window_cache().get_page(_gc, sheet_id, worksheet_name, page, page_size), None
+    except SpreadsheetNotFound:
+        return pd.DataFrame(), f"Spreadsheet with ID '{sheet_id}' not found. Please check the Sheet ID and ensure the service account has access."
+    except WorksheetNotFound:
+        return pd.DataFrame(), f"Worksheet '{worksheet_name}' not found in the spreadsheet."
+    except Exception as e:
+        return pd.DataFrame(), f"Error loading data: {str(e)}"
+
+# --- Video URL Derivation ---
+
+# (platform, pattern capturing the video ID); the first matching platform wins
+VIDEO_ID_PATTERNS = [
+    ("youtube", r"(?:youtube(?:-nocookie)?\.com/(?:watch\?(?:[^#]*&)?v=|embed/|shorts/|live/|v/)|youtu\.be/)([A-Za-z0-9_-]{11})"),
+    ("vimeo", r"vimeo\.com/(?:video/|channels/[^/?#]+/|groups/[^/?#]+/videos/)?(\d+)"),
+    ("loom", r"loom\.com/(?:share|embed)/([0-9a-fA-F]{32})"),
+    ("dailymotion", r"(?:dailymotion\.com/(?:embed/)?video/|dai\.ly/)([A-Za-z0-9]+)"),
+]
+# (platform, pattern) for URLs that play directly in a <video> element
+VIDEO_FILE_PATTERNS = [
+    ("hls", r"\.m3u8(?:[?#]|$)"),
+    ("file", r"\.(?:mp4|webm|ogg|ogv|mov|m4v)(?:[?#]|$)"),
+]
+VIDEO_CANONICAL_URLS = {
+    "youtube": "https://www.youtube.com/watch?v={}",
+    "vimeo": "https://vimeo.com/{}",
+    "loom": "https://www.loom.com/share/{}",
+    "dailymotion": "https://www.dailymotion.com/video/{}",
+}
+VIDEO_EMBED_URLS = {
+    "youtube": "https://www.youtube.com/embed/{}?autoplay=1",
+    "vimeo": "https://player.vimeo.com/video/{}?autoplay=1",
+    "loom": "https://www.loom.com/embed/{}?autoplay=1",
+    "dailymotion": "https://www.dailymotion.com/embed/video/{}?autoplay=1",
+}
+VIDEO_THUMBNAIL_URLS = {
+    "youtube": "https://img.youtube.com/vi/{}/hqdefault.jpg",
+    "loom": "https://cdn.loom.com/sessions/thumbnails/{}-with-play.gif",
+    "dailymotion": "https://www.dailymotion.com/thumbnail/video/{}",
+}
+
+
+def extract_video_id(url):
+    """Extracts the video ID from YouTube, Vimeo, Loom and Dailymotion URLs."""
+    for platform, pattern in VIDEO_ID_PATTERNS:
+        match = re.search(pattern, url, re.IGNORECASE)
+        if match:
+            return match.group(1)
+    return None
+
+
+def derive_video_columns(urls):
+    """Derives url, is_valid, platform, video_id and canonical_url for a column of video links.
+
+    All matching is vectorized over the column; the result shares the input's index.
+    """
+    url = urls.astype(str).str.strip()
+    is_valid = url.str.match(r"https?://", case=False).fillna(False).astype(bool)
+    platform = pd.Series(None, index=url.index, dtype=object)
+    video_id = pd.Series(None, index=url.index, dtype=object)
+
+    for name, pattern in VIDEO_ID_PATTERNS:
+        extracted = url.str.extract(pattern, flags=re.IGNORECASE, expand=False)
+        hit = is_valid & platform.isna() & extracted.notna()
+        platform[hit] = name
+        video_id[hit] = extracted[hit]
+    for name, pattern in VIDEO_FILE_PATTERNS:
+        hit = is_valid & platform.isna() & url.str.contains(pattern, case=False, regex=True)
+        platform[hit] = name
+    platform[is_valid & platform.isna()] = "other"
+
+    canonical_url = url.where(is_valid).astype(object)
+    for name, template in VIDEO_CANONICAL_URLS.items():
+        prefix, suffix = template.split("{}")
+        hit = platform == name
+        canonical_url[hit] = prefix + video_id[hit] + suffix
+
+    return pd.DataFrame({
+        "url": url,
+        "is_valid": is_valid,
+        "platform": platform,
+        "video_id": video_id,
+        "canonical_url": canonical_url,
+    })
+
+
+def get_video_columns(df, sheet_id, worksheet_name, video_col_name):
+    """Returns the derived video columns for df, cached per dataset version unless df is an unversioned window page."""
+    return get_artifact(
+        ("video_columns", sheet_id, worksheet_name, video_col_name), df,
+        lambda df: derive_video_columns(df[video_col_name]),
+        lambda video_info, df: pd.concat([video_info, derive_video_columns(df[video_col_name].iloc[len(video_info):])]),
+    )
+
+# --- Duplicate Detection ---
+
+DUPLICATE_TEXT_COLUMNS = ["Title", "Description", "Additional_Data"]  # compared for near-duplicates when present
+MINHASH_DENSIFY_STEP = np.uint32(0x9E3779B1)  # added per bin skipped when an empty bin borrows a neighbour's value
+
+
+def canonical_video_urls(urls):
+    """Returns a duplicate-detection key per video link: the canonical URL for known platforms, else a normalized URL.
+
+    Normalizing drops the fragment, utm_* parameters and the path's trailing
+    slashes, and lowercases the scheme and host. Invalid links map to None.
+    """
+    video_info = derive_video_columns(urls)
+    url = (
+        video_info["url"]
+        .str.replace(r"#.*$", "", regex=True)
+        .str.replace(r"(?<=[?&])utm_[^&]*(&|$)", "", regex=True)
+        .str.replace(r"[?&]$", "", regex=True)
+        .str.replace(r"^([^?]*?)/+(?=\?|$)", r"\1", regex=True)  # trailing slashes of the path, before any query
+    )
+    origin = url.str.extract(r"^https?://([^/?#]+)", flags=re.IGNORECASE, expand=False)
+    normalized = "https://" + origin.str.lower() + url.str.replace(r"^https?://[^/?#]+", "", regex=True, case=False)
+    known = video_info["platform"].isin(list(VIDEO_CANONICAL_URLS))
+    return video_info["canonical_url"].where(known, normalized).where(video_info["is_valid"], None)
+
+
+def minhash_signatures(texts):
+    """Returns a MINHASH_PERMUTATIONS-wide uint32 MinHash signature per text over character 4-gram shingles.
+
+    One-permutation hashing: each shingle is hashed once and the hash picks
+    both its signature bin and its value, so the cost is linear in the text
+    length rather than in length x permutations. Empty bins borrow the next
+    filled bin's value (densification). Texts shorter than one shingle get an
+    all-max signature and are never matched.
+    """
+    bins = MINHASH_PERMUTATIONS
+    signatures = np.full((len(texts), bins), np.iinfo(np.uint32).max, dtype=np.uint32)
+    normalized = [" ".join(str(text).lower().split()).encode("utf-8") for text in texts]
+    lengths = np.fromiter((len(text) for text in normalized), dtype=np.int64, count=len(normalized))
+    buffer = np.frombuffer(b"".join(normalized), dtype=np.uint8).astype(np.uint32)
+    if len(buffer) < 4:
+        return signatures
+
+    rows = np.repeat(np.arange(len(texts)), lengths)
+    shingles = buffer[:-3] << 24 | buffer[1:-2] << 16 | buffer[2:-1] << 8 | buffer[3:]
+    within_row = rows[:-3] == rows[3:]
+    shingles, rows = shingles[within_row], rows[:-3][within_row]
+    if len(shingles) == 0:
+        return signatures
+
+    hashed = shingles * np.uint32(0x85EBCA6B)
+    hashed ^= hashed >> 13
+    hashed *= np.uint32(0xC2B2AE35)
+    hashed ^= hashed >> 16
+
+    # Minimum value per (row, bin): sort on the packed key and keep each group's first entry
+    slots = rows.astype(np.uint64) * bins + (hashed % bins)
+    packed = np.sort(slots << np.uint64(32) | (hashed // bins).astype(np.uint64))
+    slots = packed >> np.uint64(32)
+    first = np.r_[True, slots[1:] != slots[:-1]]
+    flat = signatures.reshape(-1)
+    flat[slots[first].astype(np.int64)] = (packed[first] & np.uint64(0xFFFFFFFF)).astype(np.uint32)
+
+    # Densify rows with text: an empty bin takes the next filled bin's value (wrapping), offset by the distance
+    has_text = np.zeros(len(texts), dtype=bool)
+    has_text[rows] = True
+    dense = signatures[has_text]
+    doubled = np.concatenate([dense, dense], axis=1)
+    positions = np.where(doubled != np.iinfo(np.uint32).max, np.arange(2 * bins), 2 * bins)
+    next_filled = np.minimum.accumulate(positions[:, ::-1], axis=1)[:, ::-1][:, :bins]
+    distance = (next_filled - np.arange(bins)).astype(np.uint32)
+    dense = np.take_along_axis(doubled, next_filled, axis=1) + distance * MINHASH_DENSIFY_STEP
+    signatures[has_text] = dense
+    return signatures
+
+
+class DuplicateIndex:
+    """Exact video URL and near-duplicate text indexes for one worksheet, maintained across dataset versions.
+
+    Canonical video URLs map to the first row using them, so the form checks a
+    submission in O(1); sync only maintains this map. Titles and descriptions
+    get MinHash signatures, computed on the first near_duplicates call, that
+    are bucketed by LSH bands; only rows sharing a bucket are compared, so
+    finding near-duplicates stays sub-quadratic. Rows appended through the
+    write-behind queue are indexed incrementally; any other change rebuilds
+    the index.
+    """
+
+    def __init__(self, video_col_name):
+        self.video_col_name = video_col_name
+        self.version = None
+        self.columns = []
+        self.n_rows = 0
+        self.urls = {}  # canonical URL -> first row position, or -1 while only queued
+        self.duplicate_urls = 0
+        self.signatures = np.empty((0, MINHASH_PERMUTATIONS), dtype=np.uint32)  # of the first rows of _df
+        self._df = None
+        self._signatures_stale = False  # set when a rebuild invalidates the signatures
+        self._pairs = None  # (version, threshold, pairs) computed on first use
+        self._lock = threading.Lock()
+        self._text_lock = threading.Lock()  # held while signatures are built, without blocking URL lookups
+
+    def sync(self, df):
+        """Brings the URL index up to date with df's dataset version."""
+        with self._lock:
+            version = df.attrs.get("dataset_version")
+            if version is not None and version == self.version:
+                return
+            appended = (
+                self.version is not None
+                and df.attrs.get("parent_version") == self.version
+                and list(df.columns) == self.columns
+            )
+            if not appended:
+                self.columns = list(df.columns)
+                self.n_rows = 0
+                self.urls = {}
+                self.duplicate_urls = 0
+                self._signatures_stale = True
+            self._add_urls(df.iloc[self.n_rows:])
+            self.n_rows = len(df)
+            self.version = version
+            self._df = df
+
+    def _add_urls(self, rows):
+        if rows.empty or self.video_col_name not in rows.columns:
+            return
+        for position, key in enumerate(canonical_video_urls(rows[self.video_col_name]), start=self.n_rows):
+            if key is None:
+                continue
+            first = self.urls.get(key)
+            if first is None or first < 0:
+                self.urls[key] = position
+            else:
+                self.duplicate_urls += 1
+
+    def _sync_signatures(self, df, stale):
+        """Signs the rows of df not signed yet; all of them if the signatures are stale."""
+        signed = 0 if stale else len(self.signatures)
+        rows = df.iloc[signed:]
+        text_columns = [column for column in DUPLICATE_TEXT_COLUMNS if column in rows.columns]
+        texts = pd.Series("", index=rows.index)
+        for column in text_columns:
+            texts = texts + " " + rows[column].astype(str)
+        self.signatures = np.concatenate([self.signatures[:signed], minhash_signatures(texts.tolist())])
+
+    def find_url(self, url):
+        """Returns the row position already using url's canonical form, -1 if it is queued, or None."""
+        key = canonical_video_urls(pd.Series([url])).iloc[0]
+        with self._lock:
+            return self.urls.get(key) if key is not None else None
+
+    def known_urls(self, keys):
+        """Returns a boolean mask of the canonical URL keys already in the sheet or queued."""
+        with self._lock:
+            return keys.isin(list(self.urls)).to_numpy()
+
+    def reserve_url(self, url):
+        """Records a queued submission's URL so it is caught before the row is written."""
+        key = canonical_video_urls(pd.Series([url])).iloc[0]
+        if key is not None:
+            with self._lock:
+                self.urls.setdefault(key, -1)
+
+    def _similarity(self, row_a, row_b):
+        """Returns the estimated Jaccard similarity of each pair, compared in blocks to bound memory."""
+        if len(row_a) == 0:
+            return np.empty(0)
+        return np.concatenate([
+            (self.signatures[block_a] == self.signatures[block_b]).mean(axis=1)
+            for block_a, block_b in zip(
+                np.array_split(row_a, max(1, len(row_a) // NEAR_DUPLICATE_BLOCK_PAIRS)),
+                np.array_split(row_b, max(1, len(row_b) // NEAR_DUPLICATE_BLOCK_PAIRS)),
+            )
+        ])
+
+    @staticmethod
+    def _bucket_pairs(rows, bucket_start, bucket_size, selected):
+        """Returns every pair of rows sharing a bucket among the buckets whose rows are selected.
+
+        Buckets are runs of sorted rows; a selected bucket larger than
+        NEAR_DUPLICATE_MAX_BUCKET holds rows with identical signatures and is
+        linked to its first row instead.
+        """
+        offset = np.arange(len(rows)) - np.repeat(bucket_start, bucket_size)
+        size = np.repeat(bucket_size, bucket_size)
+        following = np.where(selected & (size <= NEAR_DUPLICATE_MAX_BUCKET), size - offset - 1, 0)
+        left = np.repeat(np.arange(len(rows)), following)
+        right = left + np.arange(len(left)) - np.repeat(np.cumsum(following) - following, following) + 1
+        starred = selected & (size > NEAR_DUPLICATE_MAX_BUCKET) & (offset > 0)
+        first = np.flatnonzero(starred) - offset[starred]
+        return (
+            np.concatenate([rows[left], rows[first]]),
+            np.concatenate([rows[right], rows[starred]]),
+        )
+
+    def near_duplicates(self, threshold=NEAR_DUPLICATE_THRESHOLD):
+        """Returns (row_a, row_b, similarity) arrays for pairs whose estimated Jaccard similarity reaches threshold.
+
+        Candidates are all pairs of rows sharing an LSH band bucket, so only a
+        small share of all row pairs is compared. Buckets above
+        NEAR_DUPLICATE_MAX_BUCKET rows are split further on the next bands.
+        """
+        with self._lock:
+            df, version, stale = self._df, self.version, self._signatures_stale
+            self._signatures_stale = False
+        if df is None:
+            return np.empty(0, int), np.empty(0, int), np.empty(0)
+        with self._text_lock:
+            if not stale and self._pairs is not None and self._pairs[:2] == (version, threshold):
+                return self._pairs[2]
+            self._sync_signatures(df, stale)
+            signatures = self.signatures
+            has_text = signatures[:, 0] != np.iinfo(np.uint32).max
+            text_rows = np.flatnonzero(has_text)
+            if len(text_rows) < 2:
+                self._pairs = (version, threshold, (np.empty(0, int), np.empty(0, int), np.empty(0)))
+                return self._pairs[2]
+            n_rows = len(signatures)
+            rows_per_band = MINHASH_PERMUTATIONS // LSH_BANDS
+            pair_keys = np.empty(0, dtype=np.int64)  # row_a * n_rows + row_b with row_a < row_b
+            for band in range(LSH_BANDS):
+                rows, keys = text_rows, np.zeros(len(text_rows), dtype=np.uint64)
+                for step in range(LSH_BANDS):
+                    # Oversized buckets are split on the following bands' values until they are small
+                    first_column = (band + step) % LSH_BANDS * rows_per_band
+                    for column in range(first_column, first_column + rows_per_band):
+                        keys = keys * np.uint64(0x9E3779B97F4A7C15) ^ signatures[rows, column].astype(np.uint64)
+                    order = np.argsort(keys, kind="stable")
+                    rows, keys = rows[order], keys[order]
+                    bucket_start = np.flatnonzero(np.r_[True, keys[1:] != keys[:-1]])
+                    bucket_size = np.diff(np.r_[bucket_start, len(rows)])
+                    small = np.repeat(bucket_size <= NEAR_DUPLICATE_MAX_BUCKET, bucket_size)
+                    if step == LSH_BANDS - 1:
+                        small[:] = True
+                    row_a, row_b = self._bucket_pairs(rows, bucket_start, bucket_size, small)
+                    # Candidates are scored as they are found so only pairs above the threshold are held
+                    similar = self._similarity(row_a, row_b) >= threshold
+                    row_a, row_b = row_a[similar], row_b[similar]
+                    pair_keys = np.concatenate([pair_keys, np.minimum(row_a, row_b) * n_rows + np.maximum(row_a, row_b)])
+                    rows, keys = rows[~small], keys[~small]
+                    if len(rows) == 0:
+                        break
+
+            # Pairs colliding in several bands are found several times
+            pair_keys = np.sort(pair_keys)
+            pair_keys = pair_keys[np.r_[True, pair_keys[1:] != pair_keys[:-1]]]
+            row_a, row_b = pair_keys // n_rows, pair_keys % n_rows
+            result = (row_a, row_b, self._similarity(row_a, row_b))
+            self._pairs = (version, threshold, result)
+            return result
+
+
+@st.cache_resource
+def get_duplicate_index_store():
+    """Returns the per-worksheet duplicate indexes shared by all sessions."""
+    return {}
+
+
+def get_duplicate_index(df, sheet_id, worksheet_name, video_col_name):
+    """Returns the duplicate index synced to df's dataset version."""
+    if df.attrs.get("dataset_version") is None:
+        index = DuplicateIndex(video_col_name)
+    else:
+        index = get_duplicate_index_store().setdefault(
+            (sheet_id, worksheet_name, video_col_name), DuplicateIndex(video_col_name)
+        )
+    index.sync(df)
+    return index
+
+
+def find_existing_video(gc, sheet_id, worksheet_name, batch_worksheets, video_col_name, url):
+    """Returns the row position of a submission already using url, -1 if it is only queued, or None."""
+    df, error = load_data(gc, sheet_id, worksheet_name, batch_worksheets)
+    if error or df.empty:
+        return None
+    return get_duplicate_index(df, sheet_id, worksheet_name, video_col_name).find_url(url)
+
+
+def reserve_video(sheet_id, worksheet_name, video_col_name, url):
+    """Marks url as taken in the shared index until its queued row shows up in the sheet."""
+    index = get_duplicate_index_store().get((sheet_id, worksheet_name, video_col_name))
+    if index is not None:
+        index.reserve_url(url)
+
+# --- Video Grid Component ---
+
+VIDEO_GRID_TEMPLATE = """
+<style>
+    * { font-family: 'Inter', sans-serif; box-sizing: border-box; }
+    body { margin: 0; background: transparent; }
+    .grid { display: grid; grid-template-columns: repeat(__COLUMNS__, minmax(0, 1fr)); gap: 20px; }
+    .card {
+        background: rgba(255, 255, 255, 0.2); border: 2px solid white; border-radius: 15px;
+        padding: 15px; color: white; content-visibility: auto; contain-intrinsic-size: 360px;
+    }
+    .card h4 { margin: 0 0 10px 0; font-size: 1.05rem; overflow-wrap: anywhere; }
+    .media {
+        position: relative; width: 100%; aspect-ratio: 16 / 9; border-radius: 10px; overflow: hidden;
+        background: linear-gradient(135deg, #667eea 0%, #764ba2 100%); cursor: pointer;
+    }
+    .media img { width: 100%; height: 100%; object-fit: cover; display: block; }
+    .media .play {
+        position: absolute; inset: 0; display: flex; align-items: center; justify-content: center;
+        font-size: 3rem; text-shadow: 0 2px 8px rgba(0, 0, 0, 0.5);
+    }
+    .media iframe, .media video { width: 100%; height: 100%; border: 0; display: block; background: black; }
+    details { margin-top: 10px; font-size: 0.85rem; }
+    summary { cursor: pointer; font-weight: 600; }
+    details p { margin: 4px 0; overflow-wrap: anywhere; }
+</style>
+<div class="grid" id="grid"></div>
+<script>
+    const cards = __CARDS__;
+    const grid = document.getElementById("grid");
+
+    function play(card, media) {
+        // Players are only created on click, so a page of cards costs one image each
+        let player;
+        if (card.kind === "file") {
+            player = document.createElement("video");
+            player.src = card.embed;
+            player.controls = true;
+            player.autoplay = true;
+        } else {
+            player = document.createElement("iframe");
+            player.src = card.embed;
+            player.allow = "autoplay; encrypted-media; fullscreen; picture-in-picture";
+            player.allowFullscreen = true;
+        }
+        media.replaceChildren(player);
+        media.style.cursor = "default";
+        media.onclick = null;
+    }
+
+    for (const card of cards) {
+        const el = document.createElement("div");
+        el.className = "card";
+
+        const title = document.createElement("h4");
+        title.textContent = "🎥 " + card.title;
+        el.appendChild(title);
+
+        const media = document.createElement("div");
+        media.className = "media";
+        if (card.thumbnail) {
+            const img = document.createElement("img");
+            img.src = card.thumbnail;
+            img.loading = "lazy";
+            img.alt = card.title;
+            media.appendChild(img);
+        }
+        const overlay = document.createElement("div");
+        overlay.className = "play";
+        overlay.textContent = "▶";
+        media.appendChild(overlay);
+        media.onclick = () => play(card, media);
+        el.appendChild(media);
+
+        const details = document.createElement("details");
+        const summary = document.createElement("summary");
+        summary.textContent = "📋 View Full Details";
+        details.appendChild(summary);
+        for (const [name, value] of card.details) {
+            const line = document.createElement("p");
+            const label = document.createElement("strong");
+            label.textContent = name + ": ";
+            line.appendChild(label);
+            line.appendChild(document.createTextNode(value));
+            details.appendChild(line);
+        }
+        el.appendChild(details);
+
+        grid.appendChild(el);
+    }
+</script>
+"""
+
+
+def video_embed(platform, video_id, url):
+    """Returns (kind, embed_url, thumbnail_url) for showing a video in the grid."""
+    if platform in ("file", "hls"):
+        return "file", url, None
+    if platform in VIDEO_EMBED_URLS:
+        thumbnail = VIDEO_THUMBNAIL_URLS[platform].format(video_id) if platform in VIDEO_THUMBNAIL_URLS else None
+        return "embed", VIDEO_EMBED_URLS[platform].format(video_id), thumbnail
+    return "page", url, None
+
+
+def render_video_grid(video_data_page, video_info, other_cols, columns, timestamps=None):
+    """Renders a page of videos as one iframe of thumbnail cards with click-to-load players.
+
+    video_info holds the derived video columns for the page's rows and
+    timestamps, if given, their parsed Timestamp values.
+    """
+    cards = []
+    for index, row in video_data_page.iterrows():
+        # Determine title
+        if other_cols and 'Title' in other_cols:
+            title_text = str(row['Title'])
+        elif other_cols:
+            title_text = str(row[other_cols[0]])
+        else:
+            title_text = f"Record {index + 1}"
+
+        info = video_info.loc[index]
+        kind, embed, thumbnail = video_embed(info["platform"], info["video_id"], info["url"])
+        details = []
+        for c in other_cols:
+            value = row[c]
+            if c == 'Timestamp' and timestamps is not None and pd.notna(timestamps.loc[index]):
+                value = format_timestamp(timestamps.loc[index])
+            details.append([c, str(value)])
+        cards.append({"title": title_text, "kind": kind, "embed": embed, "thumbnail": thumbnail, "details": details})
+
+    # Escape every "<" so cell values can neither close the script element nor open a comment in it
+    cards_json = json.dumps(cards).replace("<", "\\u003c")
+    html = VIDEO_GRID_TEMPLATE.replace("__COLUMNS__", str(columns)).replace("__CARDS__", cards_json)
+    # An iframe rather than st.html, which strips the scripts that load players on click;
+    # sized to its content, so wrapped titles and opened details are neither clipped nor padded
+    st.iframe(html, height="content")
+
+# --- Paged Data Table ---
+
+class TablePager:
+    """Sorted row orders and rendered pages of the data table, shared by all sessions.
+
+    Orders are cached per (dataset version, filter, sort) and pages per order,
+    page size and page, so paging through a large sheet only ever slices and
+    serializes the visible rows.
+    """
+
+    def __init__(self, max_orders=TABLE_CACHE_MAX_ORDERS, max_pages=TABLE_CACHE_MAX_PAGES):
+        self.max_orders = max_orders
+        self.max_pages = max_pages
+        self._orders = OrderedDict()  # (version, view_key, sort_column, descending) -> positions
+        self._pages = OrderedDict()  # order key + (page_size, page) -> frame
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _cached(entries, key, max_entries, build):
+        value = entries.get(key)
+        if value is None:
+            value = build()
+            entries[key] = value
+            while len(entries) > max_entries:
+                entries.popitem(last=False)
+        entries.move_to_end(key)
+        return value
+
+    def page(self, df, typed, view_key, positions, sort_column, descending, page, page_size):
+        """Returns rows [page * page_size, (page + 1) * page_size) of df's filtered rows in sort order.
+
+        positions are the filtered rows' positions in df; view_key identifies the
+        filter that produced them. Nothing is cached for unversioned frames.
+        """
+        version = df.attrs.get("dataset_version")
+        order_key = (version, view_key, sort_column, descending)
+
+        def build_order():
+            if sort_column is None:
+                return positions
+            values = pd.Series(typed.sort_values(sort_column)[positions])
+            ranks = values.sort_values(ascending=not descending, na_position="last", kind="stable").index
+            return positions[ranks.to_numpy()]
+
+        def build_page():
+            order = build_order() if version is None else self._cached(self._orders, order_key, self.max_orders, build_order)
+            return df.iloc[order[page * page_size:(page + 1) * page_size]]
+
+        if version is None:
+            return build_page()
+        with self._lock:
+            return self._cached(self._pages, order_key + (page_size, page), self.max_pages, build_page)
+
+
+@st.cache_resource
+def get_table_pager():
+    """Returns the data table pager shared by all sessions."""
+    return TablePager()
+
+# --- Data Export ---
+
+EXPORT_FORMATS = {  # label -> (file extension, MIME type)
+    "CSV": ("csv", "text/csv"),
+    "CSV (gzip)": ("csv.gz", "application/gzip"),
+    "Parquet": ("parquet", "application/vnd.apache.parquet"),
+    "Excel": ("xlsx", "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"),
+}
+EXCEL_MAX_ROWS = 1_048_575  # one worksheet, below the header row
+
+
+def write_export(df, export_format, path, chunk_rows=EXPORT_CHUNK_ROWS):
+    """Writes df to path in one of EXPORT_FORMATS, encoding chunk_rows rows at a time."""
+    chunks = (df.iloc[start:start + chunk_rows] for start in range(0, len(df), chunk_rows))
+
+    if export_format in ("CSV", "CSV (gzip)"):
+        opener = gzip.open if export_format == "CSV (gzip)" else open
+        with opener(path, "wt", encoding="utf-8", newline="") as f:
+            df.iloc[:0].to_csv(f, index=False)
+            for chunk in chunks:
+                chunk.to_csv(f, index=False, header=False)
+
+    elif export_format == "Parquet":
+        # Mixed-type text columns are stored as text, as in the snapshot store
+        object_cols = df.select_dtypes(include=["object", "string"]).columns
+        schema = pa.Schema.from_pandas(df.iloc[:0].astype({col: str for col in object_cols}), preserve_index=False)
+        with pq.ParquetWriter(path, schema) as writer:
+            for chunk in chunks:
+                chunk = chunk.astype({col: str for col in object_cols})
+                writer.write_table(pa.Table.from_pandas(chunk, schema=schema, preserve_index=False))
+
+    elif export_format == "Excel":
+        if len(df) > EXCEL_MAX_ROWS:
+            raise ValueError(f"Excel worksheets hold at most {EXCEL_MAX_ROWS:,} rows")
+        workbook = openpyxl.Workbook(write_only=True)
+        worksheet = workbook.create_sheet("Data")
+        worksheet.append([str(col) for col in df.columns])
+        for chunk in chunks:
+            chunk = chunk.astype(object).where(chunk.notna(), None)
+            for row in chunk.itertuples(index=False, name=None):
+                worksheet.append(row)
+        workbook.save(path)
+
+    else:
+        raise ValueError(f"Unknown export format: {export_format}")
+
+
+class ExportCache:
+    """Export files on disk keyed by (dataset version, filter, format), built only when downloaded.
+
+    Repeated downloads of the same filtered view are served from the file; the
+    least recently used files are removed beyond max_files. Files are opened
+    under a shared lock on the directory and evicted under an exclusive one, so
+    eviction in any process never removes a file between its lookup and open.
+    """
+
+    def __init__(self, root, max_files=EXPORT_CACHE_MAX_FILES):
+        self.root = root
+        self.max_files = max_files
+        make_private_dir(root)
+
+    def _path(self, key, export_format):
+        digest = hashlib.sha1(json.dumps([list(key), export_format], default=str).encode("utf-8")).hexdigest()
+        return os.path.join(self.root, f"{digest}.{EXPORT_FORMATS[export_format][0]}")
+
+    @contextmanager
+    def _lock(self, exclusive):
+        if fcntl is None:
+            yield
+            return
+        with open_private(os.path.join(self.root, "cache.lock"), "a+") as lock_file:
+            fcntl.flock(lock_file, fcntl.LOCK_EX if exclusive else fcntl.LOCK_SH)
+            try:
+                yield
+            finally:
+                fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+    def build(self, key, export_format, df):
+        """Returns the export as a binary file open for reading, writing it first unless it is already cached.
+
+        The caller reads the open file, so a later eviction cannot remove its
+        contents, and the export is never held in memory by the cache itself.
+        """
+        path = self._path(key, export_format)
+        while True:
+            with self._lock(exclusive=False):
+                try:
+                    export_file = open(path, "rb")
+                except FileNotFoundError:
+                    export_file = None
+                else:
+                    os.utime(path)  # mark as recently used
+            if export_file is not None:
+                return export_file
+            get_singleflight().do("export", path, self._write, path, export_format, df)
+
+    def _write(self, path, export_format, df):
+        if os.path.exists(path):
+            return
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        try:
+            write_export(df, export_format, tmp_path)
+            os.chmod(tmp_path, 0o600)
+            os.replace(tmp_path, path)
+        finally:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+        self._evict()
+
+    def _evict(self):
+        with self._lock(exclusive=True):
+            files = [
+                os.path.join(self.root, name) for name in os.listdir(self.root)
+                if not name.endswith((".tmp", ".lock"))
+            ]
+            if len(files) <= self.max_files:
+                return
+            files.sort(key=lambda path: os.path.getmtime(path))
+            for path in files[:len(files) - self.max_files]:
+                try:
+                    os.remove(path)
+                except OSError:
+                    pass  # already evicted, or still open on Windows
+
+
+@st.cache_resource
+def get_export_cache():
+    """Returns the export file cache shared by all sessions."""
+    return ExportCache(EXPORT_DIR)
+
+# --- Bulk Import ---
+
+IMPORT_VIDEO_ALIASES = ["url", "video", "video_url", "video_link", "link"]  # accepted for the video column
+IMPORT_FORM_COLUMNS = ["Title", None, "Additional_Data", "Category", "Tags", "Timestamp"]  # None: the video column
+
+
+def read_import_file(file_name, data):
+    """Reads an uploaded CSV, JSON array or JSON Lines file into a frame of strings.
+
+    Raises ValueError if the file cannot be parsed or holds no rows.
+    """
+    try:
+        if file_name.lower().endswith(".csv"):
+            frame = pd.read_csv(BytesIO(data), dtype=str, keep_default_na=False, skipinitialspace=True)
+        else:
+            text = data.decode("utf-8-sig")
+            if file_name.lower().endswith(".jsonl"):
+                records = [json.loads(line) for line in text.splitlines() if line.strip()]
+            else:
+                records = json.loads(text)
+            if isinstance(records, dict):
+                records = [records]
+            if not isinstance(records, list) or not all(isinstance(record, dict) for record in records):
+                raise ValueError("expected an array of objects")
+            frame = pd.DataFrame.from_records(records)
+            # Lists such as tags are joined the way the form's tag field writes them
+            frame = frame.map(lambda value: ", ".join(map(str, value)) if isinstance(value, list) else value)
+            frame = frame.astype(object).where(frame.notna(), "").astype(str)
+    except (ValueError, UnicodeDecodeError, pd.errors.ParserError) as e:
+        raise ValueError(f"Could not read {file_name}: {str(e)}") from e
+    if frame.empty:
+        raise ValueError(f"{file_name} contains no rows")
+    return frame
+
+
+def import_column_name(name):
+    """Normalizes a column name for matching: case, spaces, dashes and underscores are ignored."""
+    return re.sub(r"[\s_-]+", "", str(name)).lower()
+
+
+def prepare_import(frame, header, video_col_name, existing_index=None):
+    """Maps an uploaded frame onto the worksheet header and validates it, one vectorized pass per column.
+
+    Returns (rows, report): rows is a frame with exactly the header's columns,
+    holding only rows with a valid video URL that is neither repeated in the
+    file nor (if existing_index is given) already in the sheet. Its index keeps
+    the uploaded row positions. report summarizes the mapping and the rejects.
+    """
+    sources = {}
+    for column in frame.columns:
+        sources.setdefault(import_column_name(column), column)
+    for alias in IMPORT_VIDEO_ALIASES:
+        if import_column_name(video_col_name) not in sources and alias in sources:
+            sources[import_column_name(video_col_name)] = sources[alias]
+
+    mapping = {column: sources.get(import_column_name(column)) for column in header}
+    if mapping.get(video_col_name) is None:
+        raise ValueError(f"No column matches the video column '{video_col_name}'")
+
+    rows = pd.DataFrame({
+        column: frame[source].astype(str).str.strip() if source is not None else ""
+        for column, source in mapping.items()
+    }, index=frame.index)
+    if "Timestamp" in rows.columns:
+        rows["Timestamp"] = rows["Timestamp"].mask(rows["Timestamp"] == "", datetime.now().strftime("%Y-%m-%d %H:%M:%S"))
 
-uploaded_file = st.sidebar.file_uploader(
-    "Upload Service Account JSON", 
-    type="json", 
-    help="Upload the JSON key file for your Google Service Account with access to Google Sheets API."
-)
+    urls = canonical_video_urls(rows[video_col_name])
+    invalid = urls.isna()
+    repeated = ~invalid & urls.duplicated()
+    known = ~invalid & ~repeated & (existing_index.known_urls(urls) if existing_index is not None else False)
+    report = {
+        "mapping": {column: source for column, source in mapping.items() if source is not None},
+        "ignored": [column for column in frame.columns if column not in mapping.values()],
+        "invalid_urls": int(invalid.sum()),
+        "repeated_in_file": int(repeated.sum()),
+        "already_in_sheet": int(known.sum()),
+    }
+    return rows[~(invalid | repeated | known)], report
 
-# Sheet Configuration Section
-st.sidebar.markdown("---")
-st.sidebar.header("⚙️ Sheet Configuration")
 
-sheet_id = st.sidebar.text_input(
-    "Google Sheet ID", 
-    value=DEFAULT_SHEET_ID,
-    help="The unique ID from your Google Sheet URL (the long string between /d/ and /edit)."
-)
+class ImportCheckpoints:
+    """Progress of bulk imports on disk, so an interrupted import resumes instead of appending rows twice.
 
-video_col_name = st.sidebar.text_input(
-    "Video Link Column Name", 
-    value=DEFAULT_VIDEO_COLUMN_NAME,
-    help="The exact name of the column containing the video URLs (case-sensitive)."
-)
+    A checkpoint is keyed by the uploaded file's content and the target
+    worksheet. It records the header and uploaded row positions chosen when
+    the import started and how many of them were written; it is updated after
+    every chunk and removed once the import completes. A chunk interrupted
+    mid-request may still be written twice.
+    """
 
-# Webhook Configuration Section
-st.sidebar.markdown("---")
-st.sidebar.header("🔗 Webhook Configuration")
-st.sidebar.markdown("""
-<div style='background-color: rgba(255,255,255,0.2); padding: 10px; border-radius: 8px; margin-bottom: 15px;'>
-    <small>Optional: Configure a webhook to receive form submissions.</small>
-</div>
-""", unsafe_allow_html=True)
+    def __init__(self, root):
+        self.root = root
+        self._locks = {}
+        self._guard = threading.Lock()
+        make_private_dir(root)
 
-webhook_url = st.sidebar.text_input(
-    "Webhook URL",
-    placeholder="https://your.webhook.site/endpoint",
-    help="URL to send form data to upon submission (optional)."
-)
+    def key(self, data, sheet_id, worksheet_name):
+        """Returns the checkpoint key of one file imported into one worksheet."""
+        return hashlib.sha1(data + json.dumps([sheet_id, worksheet_name]).encode("utf-8")).hexdigest()
 
-# Display Settings Section
-st.sidebar.markdown("---")
-st.sidebar.header("🎨 Display Settings")
+    def _path(self, key):
+        return os.path.join(self.root, f"{key}.json")
 
-items_per_page = st.sidebar.slider(
-    "Videos Per Page",
-    min_value=2,
-    max_value=20,
-    value=10,
-    step=2,
-    help="Number of videos to display per page in the viewer."
-)
+    def read(self, key):
+        """Returns the checkpoint dict, or None if no import of this key is unfinished."""
+        try:
+            with open(self._path(key)) as f:
+                return json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError):
+            return None
 
-video_columns = st.sidebar.radio(
-    "Video Layout",
-    options=[1, 2, 3],
-    index=1,
-    help="Number of columns for video display."
-)
+    def write(self, key, checkpoint):
+        """Stores a checkpoint atomically."""
+        tmp_path = f"{self._path(key)}.{os.getpid()}.tmp"
+        with open_private(tmp_path) as f:
+            json.dump(dict(checkpoint, updated_at=time.time()), f)
+        os.replace(tmp_path, self._path(key))
 
-show_index = st.sidebar.checkbox(
-    "Show Row Numbers",
-    value=True,
-    help="Display row numbers in the data table."
-)
+    def remove(self, key):
+        """Drops a checkpoint once its import is complete or abandoned."""
+        try:
+            os.remove(self._path(key))
+        except FileNotFoundError:
+            pass
 
-# --- Helper Functions ---
+    @contextmanager
+    def claim(self, key):
+        """Holds the right to run the import of key, yielding False if it is running in any session.
 
-@st.cache_resource(ttl=3600)
-def get_gspread_client(service_account_info):
-    """Authenticates gspread using the service account info with proper credentials."""
-    try:
-        # Create credentials object
-        credentials = Credentials.from_service_account_info(
-            service_account_info,
-            scopes=SCOPES
-        )
-        
-        # Authorize gspread client
-        gc = gspread.authorize(credentials)
-        return gc
-    except Exception as e:
-        st.error(f"❌ Authentication failed. Error details: {str(e)}")
-        st.info("💡 Make sure your JSON file contains valid service account credentials and that the Google Sheets API is enabled.")
-        return None
+        Uses a per-key lock file like the snapshot writers, so imports are
+        exclusive across server processes and a crashed import releases it.
+        """
+        with self._guard:
+            lock = self._locks.setdefault(key, threading.Lock())
+        if not lock.acquire(blocking=False):
+            yield False
+            return
+        try:
+            if fcntl is None:
+                yield True
+                return
+            with open_private(self._path(key) + ".lock", "a+") as lock_file:
+                try:
+                    fcntl.flock(lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+                except BlockingIOError:
+                    yield False
+                    return
+                try:
+                    yield True
+                finally:
+                    fcntl.flock(lock_file, fcntl.LOCK_UN)
+        finally:
+            lock.release()
 
-@st.cache_data(ttl=600)
-def load_data(_gc, sheet_id, worksheet_name):
-    """Loads data from the specified worksheet of the Google Sheet."""
-    try:
-        sh = _gc.open_by_key(sheet_id)
-        worksheet = sh.worksheet(worksheet_name)
-        data = worksheet.get_all_records()
-        df = pd.DataFrame(data)
-        return df, None
-    except SpreadsheetNotFound:
-        error_msg = f"Spreadsheet with ID '{sheet_id}' not found. Please check the Sheet ID and ensure the service account has access."
-        return pd.DataFrame(), error_msg
-    except WorksheetNotFound:
-        error_msg = f"Worksheet '{worksheet_name}' not found in the spreadsheet."
-        return pd.DataFrame(), error_msg
-    except Exception as e:
-        error_msg = f"Error loading data: {str(e)}"
-        return pd.DataFrame(), error_msg
 
-def get_worksheet_list(_gc, sheet_id):
-    """Retrieves list of worksheet names from the spreadsheet."""
-    try:
-        spreadsheet = _gc.open_by_key(sheet_id)
-        worksheet_titles = [ws.title for ws in spreadsheet.worksheets()]
-        return worksheet_titles, None
-    except SpreadsheetNotFound:
-        return [], f"Spreadsheet with ID '{sheet_id}' not found."
-    except Exception as e:
-        return [], f"Could not retrieve worksheet list. Error: {str(e)}"
+@st.cache_resource
+def get_import_checkpoints():
+    """Returns the bulk import checkpoints shared by all sessions."""
+    return ImportCheckpoints(IMPORT_DIR)
 
-def extract_video_id(url):
-    """Extracts video ID from various video platforms."""
-    # This is a placeholder - you can expand this for different platforms
-    if 'youtube.com' in url or 'youtu.be' in url:
-        if 'youtu.be/' in url:
-            return url.split('youtu.be/')[-1].split('?')[0]
-        elif 'v=' in url:
-            return url.split('v=')[-1].split('&')[0]
-    return None
 
-def format_timestamp(timestamp):
-    """Formats timestamp for display."""
+def run_import(gc, sheet_id, worksheet_name, values, key, checkpoint, on_progress=None, chunk_rows=IMPORT_CHUNK_ROWS):
+    """Appends values from checkpoint["written"] on in append_rows chunks, saving progress after each chunk.
+
+    The rows written are passed through to the cached frames once, when the
+    import ends or stops, rather than per chunk. Returns the number of rows
+    written; API errors propagate once the checkpoint holds every chunk
+    written before them.
+    """
+    checkpoints = get_import_checkpoints()
+    worksheet = get_metadata_cache().get(gc, sheet_id).worksheet(worksheet_name)
+    first_written = checkpoint["written"]
     try:
-        if isinstance(timestamp, str):
-            dt = datetime.strptime(timestamp, "%Y-%m-%d %H:%M:%S")
-            return dt.strftime("%B %d, %Y at %I:%M %p")
-        return timestamp
-    except:
-        return timestamp
+        while checkpoint["written"] < len(values):
+            chunk = values[checkpoint["written"]:checkpoint["written"] + chunk_rows]
+            worksheet.append_rows(chunk)
+            checkpoint["written"] += len(chunk)
+            checkpoints.write(key, checkpoint)
+            if on_progress is not None:
+                on_progress(checkpoint["written"], len(values))
+    finally:
+        if checkpoint["written"] > first_written:
+            on_rows_appended(sheet_id, worksheet_name, values[first_written:checkpoint["written"]])
+    checkpoints.remove(key)
+    return checkpoint["written"]
 
 # --- Main Application Logic ---
+selected_worksheet = None
+
 if uploaded_file is not None:
     # Read and parse the uploaded JSON file
     try:
-        stringio = StringIO(uploaded_file.getvalue().decode("utf-8"))
-        service_account_info = json.load(stringio)
+        with rerun_timer.span("auth.parse_json"):
+            stringio = StringIO(uploaded_file.getvalue().decode("utf-8"))
+            service_account_info = json.load(stringio)
         
         # Validate that it's a proper service account file
         required_fields = ['type', 'project_id', 'private_key_id', 'private_key', 'client_email']
@@ -482,8 +3549,8 @@ if uploaded_file is not None:
         st.stop()
 
     # Authenticate with Google Sheets
-    with st.spinner("🔄 Authenticating with Google Sheets..."):
-        gc = get_gspread_client(service_account_info)
+    with st.spinner("🔄 Authenticating with Google Sheets..."), rerun_timer.span("auth.get_gspread_client"):
+        gc = get_gspread_client(service_account_info, key_fingerprint(uploaded_file.getvalue()))
     
     if gc:
         st.sidebar.success("✅ Authentication successful!")
@@ -493,7 +3560,8 @@ if uploaded_file is not None:
         st.sidebar.info(f"📧 Connected as:\n`{service_email}`")
         
         # Retrieve worksheet list
-        worksheet_titles, error = get_worksheet_list(gc, sheet_id)
+        with rerun_timer.span("get_worksheet_list"):
+            worksheet_titles, error = get_worksheet_list(gc, sheet_id)
         
         if error:
             st.error(f"❌ {error}")
@@ -513,52 +3581,109 @@ if uploaded_file is not None:
             help="Choose the tab in your Google Sheet to load data from."
         )
         
+        batch_load_tabs = st.sidebar.checkbox(
+            "Load tabs together",
+            value=False,
+            help="Fetch several tabs with a single batched request whenever the selected tab needs loading."
+        )
+        batch_worksheets = None
+        if batch_load_tabs:
+            batch_worksheets = st.sidebar.multiselect(
+                "Tabs to load together",
+                options=worksheet_titles,
+                default=worksheet_titles,
+                help="Leave out very large tabs that are rarely viewed."
+            )
+        
+        windowed_loading = st.sidebar.checkbox(
+            "Windowed loading (large sheets)",
+            value=False,
+            help="Read only the rows of the current page. The full sheet is loaded when you search, filter or open analytics."
+        )
+        
+        prefetch_tabs = st.sidebar.checkbox(
+            "Prefetch other tabs",
+            value=False,
+            help="Load the remaining tabs in the background after the selected one is shown. "
+                 "With 'Load tabs together' on, only the tabs chosen there are prefetched."
+        )
+        
         # Add a refresh button
         if st.sidebar.button("🔄 Refresh Data", help="Clear cache and reload data from Google Sheets"):
-            st.cache_data.clear()
+            invalidate_dataset(sheet_id, selected_worksheet)
+            get_metadata_cache().invalidate(sheet_id)
             st.rerun()
 
         # --- Create Tabs for Different Functions ---
+        # Each tab is a fragment that only runs while it is open; its widgets rerun just that fragment
         viewer_tab, form_tab, analytics_tab = st.tabs([
             "👁️ Data Viewer", 
             "📝 Data Submission Form",
             "📊 Analytics Dashboard"
-        ])
+        ], key="main_tab", on_change="rerun")
 
         # ==========================================
         # DATA VIEWER TAB
         # ==========================================
-        with viewer_tab:
+        @timed_fragment("viewer")
+        def data_viewer():
             st.markdown("## 📊 Data Viewer")
             
+            # Windowed mode reads only the current page until a search or filter needs the whole sheet
+            windowed = (
+                windowed_loading
+                and not st.session_state.get("search_term")
+                and not st.session_state.get("filter_expression")
+                and get_dataset_cache().get(sheet_id, selected_worksheet, max_age=DATASET_MAX_STALENESS) is None
+            )
+            
             # Load data
-            with st.spinner("📥 Loading data from Google Sheets..."):
-                df, load_error = load_data(gc, sheet_id, selected_worksheet)
+            with st.spinner("📥 Loading data from Google Sheets..."), rerun_timer.span("viewer.load_data"):
+                if windowed:
+                    try:
+                        total_rows = get_row_window_cache().total_rows(gc, sheet_id, selected_worksheet)
+                    except Exception:
+                        total_rows = 0
+                    total_window_pages = max((total_rows - 1) // items_per_page + 1, 1)
+                    window_page = min(st.session_state.get("window_page", 1), total_window_pages)
+                    st.session_state["window_page"] = window_page
+                    df, load_error = load_window(gc, sheet_id, selected_worksheet, window_page - 1, items_per_page)
+                else:
+                    df, load_error = load_data(gc, sheet_id, selected_worksheet, batch_worksheets)
+                    total_rows = len(df)
             
             if load_error:
                 st.error(f"❌ {load_error}")
                 st.stop()
             
-            if not df.empty:
+            if not df.empty or windowed:
                 # Display metrics
                 col1, col2, col3, col4 = st.columns(4)
                 
                 with col1:
-                    st.metric("📝 Total Records", len(df))
+                    st.metric("📝 Total Records", total_rows)
                 
                 with col2:
-                    video_count = 0
-                    if video_col_name in df.columns:
-                        video_count = df[video_col_name].astype(str).str.startswith('http').sum()
+                    video_count = "—" if windowed else 0
+                    if video_col_name in df.columns and not windowed:
+                        video_count = get_video_columns(df, sheet_id, selected_worksheet, video_col_name)["is_valid"].sum()
                     st.metric("🎬 Video Links", video_count)
                 
                 with col3:
                     st.metric("📋 Columns", len(df.columns))
                 
                 with col4:
-                    if 'Timestamp' in df.columns:
-                        recent_count = len(df[df['Timestamp'].astype(str).str.contains('2025')])
-                        st.metric("🆕 Recent (2025)", recent_count)
+                    if windowed:
+                        st.metric("🪟 Sheet Page", f"{window_page} / {total_window_pages}")
+                    elif 'Timestamp' in df.columns:
+                        cutoff = pd.Timestamp.now() - pd.Timedelta(days=RECENT_WINDOW_DAYS)
+                        timestamps = get_typed_columns(df, sheet_id, selected_worksheet).datetimes('Timestamp')
+                        recent_count = int((timestamps >= cutoff).sum())
+                        st.metric(
+                            f"🆕 Recent ({RECENT_WINDOW_DAYS} days)",
+                            recent_count,
+                            help=f"Records with a Timestamp in the last {RECENT_WINDOW_DAYS} days"
+                        )
                     else:
                         st.metric("📊 Data Quality", "N/A")
                 
@@ -573,7 +3698,8 @@ if uploaded_file is not None:
                     search_term = st.text_input(
                         "Search across all columns",
                         help="Enter text to filter the table and videos.",
-                        placeholder="Type to search titles, descriptions, URLs..."
+                        placeholder="Type to search titles, descriptions, URLs...",
+                        key="search_term"
                     )
                 
                 with filter_col2:
@@ -584,41 +3710,139 @@ if uploaded_file is not None:
                             options=["All Columns"] + list(df.columns)
                         )
                 
+                filter_expression = st.text_input(
+                    "Filter expression",
+                    help="Combine column conditions with AND / OR / NOT. Operators: =, !=, <, <=, >, >=, has. "
+                         "Quote values containing spaces and wrap column names containing spaces in `backticks`.",
+                    placeholder='Category = Tutorial AND Timestamp >= 2025-01-01 AND Tags has "demo"',
+                    key="filter_expression"
+                )
+                
                 # Apply filters
-                df_filtered = df.copy()
+                with rerun_timer.span("viewer.filter"):
+                    df_filtered = df
+                    dataset_version = df.attrs.get("dataset_version")
                 
-                if search_term:
-                    if filter_column == "All Columns":
-                        df_filtered = df[df.apply(
-                            lambda row: row.astype(str).str.contains(search_term, case=False).any(), 
-                            axis=1
-                        )]
-                    else:
-                        df_filtered = df[df[filter_column].astype(str).str.contains(search_term, case=False)]
+                    row_mask = None
+                    if filter_expression:
+                        try:
+                            row_mask = get_typed_columns(df, sheet_id, selected_worksheet).mask(filter_expression)
+                        except FilterSyntaxError as e:
+                            st.error(f"❌ Invalid filter expression: {str(e)}")
+                
+                    if search_term:
+                        search_index = get_search_index(df, sheet_id, selected_worksheet)
+                        search_column = None if filter_column == "All Columns" else filter_column
+                        positions = search_index.search(search_term, search_column)
+                        if row_mask is not None:
+                            positions = positions[row_mask[positions]]
+                        df_filtered = df.iloc[positions]
+                    elif row_mask is not None:
+                        df_filtered = df[row_mask]
+                    
+                    # Identifies the filtered view for the table page and export caches
+                    view_key = (search_term, filter_column if search_term else None, filter_expression)
                 
                 # Display filtered results count
+                if windowed:
+                    first_row = (window_page - 1) * items_per_page
+                    results_summary = f"Displaying rows {first_row + 1}-{first_row + len(df)} of {total_rows}"
+                else:
+                    results_summary = f"Displaying {len(df_filtered)} of {len(df)} Records"
                 st.markdown(f"""
                 <div style='background: rgba(255, 255, 255, 0.2); 
                             padding: 15px; border-radius: 10px; color: white; text-align: center; margin: 20px 0;
                             border: 2px solid white;'>
-                    <h3 style='margin: 0; color: white;'>Displaying {len(df_filtered)} of {len(df)} Records</h3>
+                    <h3 style='margin: 0; color: white;'>{results_summary}</h3>
                 </div>
                 """, unsafe_allow_html=True)
                 
+                if windowed:
+                    page_col1, page_col2, page_col3 = st.columns([1, 2, 1])
+                    with page_col2:
+                        st.number_input(
+                            f"Sheet page (1-{total_window_pages})",
+                            min_value=1,
+                            max_value=total_window_pages,
+                            key="window_page",
+                            help="Windowed loading reads one page of rows at a time."
+                        )
+                
                 # Data table with options
-                if show_index:
-                    st.dataframe(df_filtered, use_container_width=True, height=400)
-                else:
-                    st.dataframe(df_filtered.reset_index(drop=True), use_container_width=True, height=400)
+                if paged_table:
+                    table_col1, table_col2, table_col3, table_col4 = st.columns([1, 2, 1, 3])
+                    with table_col1:
+                        table_page_size = st.selectbox("Rows per page", options=TABLE_PAGE_SIZES, index=2, key="table_page_size")
+                    with table_col2:
+                        sort_choice = st.selectbox("Sort by", options=["Sheet order"] + list(df.columns), key="table_sort")
+                    with table_col3:
+                        sort_descending = st.toggle("Descending", key="table_sort_descending")
+                    with table_col4:
+                        table_columns = st.multiselect(
+                            "Columns", options=list(df.columns), default=list(df.columns), key="table_columns"
+                        )
+                    
+                    total_table_pages = max((len(df_filtered) - 1) // table_page_size + 1, 1)
+                    st.session_state["table_page"] = min(st.session_state.get("table_page", 1), total_table_pages)
+                
+                with rerun_timer.span("viewer.table"):
+                    if paged_table:
+                        table_page = st.session_state["table_page"]
+                        page_frame = get_table_pager().page(
+                            df,
+                            get_typed_columns(df, sheet_id, selected_worksheet),
+                            view_key,
+                            df.index.get_indexer(df_filtered.index),
+                            None if sort_choice == "Sheet order" else sort_choice,
+                            sort_descending,
+                            table_page - 1,
+                            table_page_size
+                        )
+                        st.dataframe(
+                            page_frame[table_columns or list(df.columns)],
+                            use_container_width=True,
+                            height=400,
+                            hide_index=not show_index
+                        )
+                    else:
+                        st.dataframe(df_filtered, use_container_width=True, height=400, hide_index=not show_index)
+                
+                if paged_table:
+                    page_col1, page_col2, page_col3 = st.columns([1, 2, 1])
+                    with page_col2:
+                        st.number_input(
+                            f"Table page (1-{total_table_pages})",
+                            min_value=1,
+                            max_value=total_table_pages,
+                            key="table_page"
+                        )
                 
                 # Download options
-                csv = df_filtered.to_csv(index=False).encode('utf-8')
-                st.download_button(
-                    label="📥 Download Filtered Data as CSV",
-                    data=csv,
-                    file_name=f'{selected_worksheet}_filtered_{datetime.now().strftime("%Y%m%d")}.csv',
-                    mime='text/csv',
-                )
+                if windowed:
+                    st.caption("📥 Search, filter or turn off windowed loading to download the full data.")
+                else:
+                    export_formats = [
+                        label for label in EXPORT_FORMATS
+                        if label != "Excel" or len(df_filtered) <= EXCEL_MAX_ROWS
+                    ]
+                    export_col1, export_col2 = st.columns([1, 2])
+                    with export_col1:
+                        export_format = st.selectbox(
+                            "Export format",
+                            options=export_formats,
+                            key="export_format",
+                            label_visibility="collapsed"
+                        )
+                    extension, mime = EXPORT_FORMATS[export_format]
+                    export_key = (sheet_id, selected_worksheet, dataset_version) + view_key
+                    with export_col2:
+                        # The file is only encoded when the button is clicked
+                        st.download_button(
+                            label=f"📥 Download Filtered Data as {export_format}",
+                            data=functools.partial(get_export_cache().build, export_key, export_format, df_filtered),
+                            file_name=f'{selected_worksheet}_filtered_{datetime.now().strftime("%Y%m%d")}.{extension}',
+                            mime=mime,
+                        )
                 
                 st.markdown("---")
                 
@@ -627,81 +3851,59 @@ if uploaded_file is not None:
                 # ==========================================
                 st.markdown("### 🎬 Embedded Videos")
                 
-                if video_col_name in df_filtered.columns:
-                    video_data = df_filtered[
-                        df_filtered[video_col_name].astype(str).str.startswith('http')
-                    ].reset_index(drop=True)
+                @timed_fragment("viewer.video_grid")
+                def video_grid():
+                    if video_col_name in df_filtered.columns:
+                        video_info = get_video_columns(df, sheet_id, selected_worksheet, video_col_name)
+                        video_data = df_filtered[video_info["is_valid"].loc[df_filtered.index].to_numpy()]
                     
-                    if not video_data.empty:
-                        st.success(f"✨ Found **{len(video_data)}** video(s) matching your criteria")
+                        if not video_data.empty:
+                            st.success(f"✨ Found **{len(video_data)}** video(s) matching your criteria")
                         
-                        # Pagination
-                        if len(video_data) > items_per_page:
-                            total_pages = (len(video_data) - 1) // items_per_page + 1
+                            # Pagination
+                            if len(video_data) > items_per_page:
+                                total_pages = (len(video_data) - 1) // items_per_page + 1
                             
-                            page_col1, page_col2, page_col3 = st.columns([1, 2, 1])
-                            with page_col2:
-                                current_page = st.number_input(
-                                    f"Page (1-{total_pages})",
-                                    min_value=1,
-                                    max_value=total_pages,
-                                    value=1,
-                                    key="video_page"
-                                )
+                                page_col1, page_col2, page_col3 = st.columns([1, 2, 1])
+                                with page_col2:
+                                    current_page = st.number_input(
+                                        f"Page (1-{total_pages})",
+                                        min_value=1,
+                                        max_value=total_pages,
+                                        value=1,
+                                        key="video_page"
+                                    )
                             
-                            start_idx = (current_page - 1) * items_per_page
-                            end_idx = start_idx + items_per_page
-                            video_data_page = video_data.iloc[start_idx:end_idx]
-                        else:
-                            video_data_page = video_data
+                                start_idx = (current_page - 1) * items_per_page
+                                end_idx = start_idx + items_per_page
+                                video_data_page = video_data.iloc[start_idx:end_idx]
+                            else:
+                                video_data_page = video_data
                         
-                        # Video display
-                        cols = st.columns(video_columns)
-                        
-                        for index, row in video_data_page.iterrows():
-                            col = cols[index % video_columns]
-                            
-                            with col:
-                                # Card-like container for each video
-                                with st.container():
-                                    # Determine title
-                                    other_cols = [c for c in df_filtered.columns if c != video_col_name]
-                                    
-                                    if other_cols and 'Title' in other_cols:
-                                        title_text = str(row['Title'])
-                                    elif other_cols:
-                                        title_text = str(row[other_cols[0]])
-                                    else:
-                                        title_text = f"Record {index + 1}"
-                                    
-                                    st.markdown(f"#### 🎥 {title_text}")
-                                    
-                                    # Expandable details
-                                    with st.expander("📋 View Full Details", expanded=False):
-                                        for c in other_cols:
-                                            value = row[c]
-                                            if c == 'Timestamp':
-                                                value = format_timestamp(value)
-                                            st.markdown(f"**{c}:** {value}")
-                                    
-                                    # Video embed
-                                    try:
-                                        st.video(row[video_col_name])
-                                    except Exception as e:
-                                        st.error(f"❌ Error loading video: {str(e)}")
-                                        st.code(row[video_col_name])
-                                    
-                                    st.markdown("---")
+                            # Video display
+                            render_video_grid(
+                                video_data_page,
+                                video_info.loc[video_data_page.index],
+                                [c for c in df_filtered.columns if c != video_col_name],
+                                video_columns,
+                                timestamps=(
+                                    get_typed_columns(df, sheet_id, selected_worksheet)
+                                    .datetimes('Timestamp').loc[video_data_page.index]
+                                    if 'Timestamp' in df.columns else None
+                                )
+                            )
                         
-                        # Page navigation summary
-                        if len(video_data) > items_per_page:
-                            st.info(f"📄 Showing videos {start_idx + 1}-{min(end_idx, len(video_data))} of {len(video_data)}")
+                            # Page navigation summary
+                            if len(video_data) > items_per_page:
+                                st.info(f"📄 Showing videos {start_idx + 1}-{min(end_idx, len(video_data))} of {len(video_data)}")
+                        else:
+                            st.warning(f"⚠️ No valid video links found in column **'{video_col_name}'** in the filtered data.")
+                            st.info("💡 Video links must start with 'http://' or 'https://' to be displayed.")
                     else:
-                        st.warning(f"⚠️ No valid video links found in column **'{video_col_name}'** in the filtered data.")
-                        st.info("💡 Video links must start with 'http' to be displayed.")
-                else:
-                    st.error(f"❌ Column **'{video_col_name}'** not found in the worksheet.")
-                    st.info(f"📋 Available columns: **{', '.join(df_filtered.columns)}**")
+                        st.error(f"❌ Column **'{video_col_name}'** not found in the worksheet.")
+                        st.info(f"📋 Available columns: **{', '.join(df_filtered.columns)}**")
+                
+                video_grid()
             else:
                 st.warning("⚠️ The worksheet appears to be empty or has no data.")
                 st.info("💡 Please check the worksheet content and ensure your service account has proper permissions.")
@@ -709,7 +3911,8 @@ if uploaded_file is not None:
         # ==========================================
         # DATA SUBMISSION FORM TAB
         # ==========================================
-        with form_tab:
+        @timed_fragment("form")
+        def submission_form():
             st.markdown("## 📝 Submit New Data")
             st.markdown("""
             <div style='background-color: rgba(255, 255, 255, 0.2); padding: 20px; border-radius: 15px; margin-bottom: 25px; border: 2px solid white;'>
@@ -720,6 +3923,12 @@ if uploaded_file is not None:
             </div>
             """, unsafe_allow_html=True)
 
+            # Acknowledgements for rows still being written by the append queue
+            st.fragment(
+                show_append_acknowledgements,
+                run_every=1 if st.session_state.get("pending_appends") else None
+            )()
+
             with st.form("data_submission_form", clear_on_submit=True):
                 st.markdown("### 📋 Form Fields")
                 
@@ -788,6 +3997,12 @@ if uploaded_file is not None:
                         disabled=(not webhook_url),
                         help="Send this data to the configured webhook URL"
                     )
+
+                allow_duplicate = st.checkbox(
+                    "♻️ Allow duplicate video URL",
+                    value=False,
+                    help="Append even if the worksheet already has a row with this video"
+                )
                 
                 st.markdown("---")
                 
@@ -806,6 +4021,15 @@ if uploaded_file is not None:
                         st.error("❌ The Video URL field is required. Please enter a valid URL.")
                     elif not video_url_input.startswith('http'):
                         st.error("❌ Please enter a valid URL starting with http:// or https://")
+                    elif submit_to_sheet and not allow_duplicate and (
+                        existing_row := find_existing_video(gc, sheet_id, selected_worksheet, batch_worksheets,
+                                                            video_col_name, video_url_input)
+                    ) is not None:
+                        if existing_row < 0:
+                            st.error("❌ This video was already submitted and is still being written to the sheet.")
+                        else:
+                            st.error(f"❌ This video is already in the sheet (row {existing_row + 2}). "
+                                     "Tick 'Allow duplicate video URL' to add it anyway.")
                     else:
                         # Add timestamp
                         form_data["Timestamp"] = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
@@ -818,11 +4042,8 @@ if uploaded_file is not None:
                         
                         # 1. Append to Google Sheet
                         if submit_to_sheet:
-                            status_text.text("📊 Submitting to Google Sheets...")
+                            status_text.text("📊 Queueing submission for Google Sheets...")
                             try:
-                                sh = gc.open_by_key(sheet_id)
-                                worksheet = sh.worksheet(selected_worksheet)
-                                
                                 # Prepare data as a list
                                 values = [
                                     form_data.get("Title", ""),
@@ -833,44 +4054,33 @@ if uploaded_file is not None:
                                     form_data.get("Timestamp", "")
                                 ]
                                 
-                                worksheet.append_row(values)
-                                st.success(f"✅ Successfully added data to worksheet: **{selected_worksheet}**")
+                                # Written in the background together with other pending rows
+                                ticket = get_append_queue().submit(gc, sheet_id, selected_worksheet, values)
+                                reserve_video(sheet_id, selected_worksheet, video_col_name, video_url_input)
+                                st.session_state.setdefault("pending_appends", []).append({
+                                    "title": form_data.get("Title", ""),
+                                    "worksheet": selected_worksheet,
+                                    "future": ticket,
+                                })
+                                st.success(f"✅ Queued for worksheet: **{selected_worksheet}** (written within a few seconds)")
                                 success_count += 1
                                 progress_bar.progress(success_count / total_operations)
                                 
-                                # Clear cache
-                                st.cache_data.clear()
-                                
                             except Exception as e:
-                                st.error(f"❌ Failed to append to Google Sheet: {str(e)}")
+                                st.error(f"❌ Failed to queue Google Sheet append: {str(e)}")
                                 progress_bar.progress(success_count / total_operations)
 
                         # 2. Send to Webhook
                         if submit_to_webhook and webhook_url:
-                            status_text.text("🔗 Sending to webhook...")
+                            status_text.text("🔗 Queueing webhook delivery...")
                             try:
-                                response = requests.post(
-                                    webhook_url,
-                                    json=form_data,
-                                    timeout=10,
-                                    headers={'Content-Type': 'application/json'}
-                                )
-                                
-                                if response.status_code in [200, 201, 202]:
-                                    st.success(f"✅ Successfully sent data to webhook")
-                                    success_count += 1
-                                else:
-                                    st.warning(f"⚠️ Webhook returned status code: {response.status_code}")
-                                    st.code(response.text)
-                                
-                                progress_bar.progress(success_count / total_operations)
-                                
-                            except requests.exceptions.Timeout:
-                                st.error("❌ Webhook request timed out (10 seconds)")
-                                progress_bar.progress(success_count / total_operations)
-                            except requests.exceptions.RequestException as e:
-                                st.error(f"❌ Failed to send to webhook: {str(e)}")
-                                progress_bar.progress(success_count / total_operations)
+                                # Delivered in the background with retries; survives restarts
+                                get_webhook_outbox().enqueue(webhook_url, form_data)
+                                st.success("✅ Webhook delivery queued")
+                                success_count += 1
+                            except sqlite3.Error as e:
+                                st.error(f"❌ Failed to queue webhook delivery: {str(e)}")
+                            progress_bar.progress(success_count / total_operations)
                         
                         elif submit_to_webhook and not webhook_url:
                             st.warning("⚠️ Webhook URL not configured in the sidebar")
@@ -889,184 +4099,375 @@ if uploaded_file is not None:
                         else:
                             st.error("❌ All operations failed. Please check your configuration and try again.")
 
+            # Bulk import: many rows from one file, written in chunks with a resumable checkpoint
+            with st.expander("📦 Bulk Import from CSV / JSON"):
+                import_file = st.file_uploader(
+                    "Upload a CSV, JSON array or JSON Lines file",
+                    type=["csv", "json", "jsonl"],
+                    key="import_file",
+                    help="Columns are matched to the sheet header by name; case, spaces and underscores are ignored."
+                )
+                if import_file is not None:
+                    with rerun_timer.span("form.import_prepare"):
+                        import_data = import_file.getvalue()
+                        checkpoints = get_import_checkpoints()
+                        import_key = checkpoints.key(import_data, sheet_id, selected_worksheet)
+                        checkpoint = checkpoints.read(import_key)
+                        try:
+                            frame = read_import_file(import_file.name, import_data)
+                            if checkpoint is None:
+                                df, load_error = load_data(gc, sheet_id, selected_worksheet, batch_worksheets)
+                                if load_error:
+                                    raise ValueError(load_error)
+                                # A sheet with a header row but no data rows loads as an empty frame
+                                header = (
+                                    list(df.columns)
+                                    or get_metadata_cache().headers(gc, sheet_id).get(selected_worksheet)
+                                    or [column or video_col_name for column in IMPORT_FORM_COLUMNS]
+                                )
+                                skip_existing = st.checkbox(
+                                    "⏭️ Skip video URLs already in the sheet",
+                                    value=True,
+                                    key="import_skip_existing"
+                                )
+                                existing_index = (
+                                    get_duplicate_index(df, sheet_id, selected_worksheet, video_col_name)
+                                    if skip_existing and not df.empty else None
+                                )
+                                import_rows, import_report = prepare_import(frame, header, video_col_name, existing_index)
+                            else:
+                                # Resume with the header and rows chosen when the import started
+                                header = checkpoint["header"]
+                                import_rows, import_report = prepare_import(frame, header, video_col_name)
+                                import_rows = import_rows.reindex(checkpoint["positions"], fill_value="")
+                            import_error = None
+                        except ValueError as e:
+                            import_error = str(e)
+
+                    if import_error:
+                        st.error(f"❌ {import_error}")
+                    else:
+                        st.markdown(
+                            f"**{len(frame):,}** rows read · **{len(import_rows):,}** to import · "
+                            f"{import_report['invalid_urls']:,} without a valid video URL · "
+                            f"{import_report['repeated_in_file']:,} repeated in the file · "
+                            f"{import_report['already_in_sheet']:,} already in the sheet"
+                        )
+                        st.dataframe(
+                            pd.DataFrame({
+                                "Sheet column": header,
+                                "File column": [import_report["mapping"].get(column, "—") for column in header],
+                            }),
+                            use_container_width=True,
+                            hide_index=True
+                        )
+                        if import_report["ignored"]:
+                            st.caption(f"Ignored file columns: {', '.join(map(str, import_report['ignored']))}")
+
+                        if checkpoint is not None:
+                            st.info(
+                                f"⏸️ An earlier import of this file stopped after **{checkpoint['written']:,}** "
+                                f"of **{len(import_rows):,}** rows. Importing again resumes from there."
+                            )
+                            if st.button("🗑️ Discard Import Progress", key="import_discard"):
+                                checkpoints.remove(import_key)
+                                st.rerun()
+
+                        if st.button(
+                            f"{'▶️ Resume' if checkpoint else '📦 Import'} {len(import_rows):,} Rows into {selected_worksheet}",
+                            type="primary",
+                            disabled=import_rows.empty,
+                            key="import_start"
+                        ):
+                            with checkpoints.claim(import_key) as claimed:
+                                if not claimed:
+                                    st.warning("⚠️ This file is already being imported in another session.")
+                                else:
+                                    # Another session may have started or advanced this import meanwhile
+                                    stored = checkpoints.read(import_key)
+                                    if stored is None:
+                                        checkpoint = {
+                                            "file_name": import_file.name,
+                                            "header": header,
+                                            "positions": import_rows.index.tolist(),
+                                            "written": 0,
+                                        }
+                                        checkpoints.write(import_key, checkpoint)
+                                    else:
+                                        if checkpoint is None or stored["positions"] != checkpoint["positions"]:
+                                            import_rows = prepare_import(frame, stored["header"], video_col_name)[0]
+                                            import_rows = import_rows.reindex(stored["positions"], fill_value="")
+                                        checkpoint = stored
+                                    progress_bar = st.progress(
+                                        checkpoint["written"] / len(import_rows),
+                                        text=f"Written {checkpoint['written']:,} of {len(import_rows):,} rows"
+                                    )
+                                    try:
+                                        with rerun_timer.span("form.import_write"):
+                                            written = run_import(
+                                                gc, sheet_id, selected_worksheet, import_rows.values.tolist(),
+                                                import_key, checkpoint,
+                                                on_progress=lambda done, total: progress_bar.progress(
+                                                    done / total, text=f"Written {done:,} of {total:,} rows"
+                                                )
+                                            )
+                                        st.success(f"✅ Imported **{written:,}** rows into worksheet **{selected_worksheet}**")
+                                    except Exception as e:
+                                        st.error(
+                                            f"❌ Import stopped after {checkpoint['written']:,} of {len(import_rows):,} rows: "
+                                            f"{str(e)}. Import the same file again to resume."
+                                        )
+
         # ==========================================
         # ANALYTICS DASHBOARD TAB
         # ==========================================
-        with analytics_tab:
+        @timed_fragment("analytics")
+        def analytics_dashboard():
             st.markdown("## 📊 Analytics Dashboard")
             
-            # Load data for analytics
-            df, load_error = load_data(gc, sheet_id, selected_worksheet)
+            # Load data for analytics (deferred in windowed mode until the full sheet is requested)
+            analytics_deferred = (
+                windowed_loading
+                and not st.session_state.get("analytics_full_load")
+                and get_dataset_cache().get(sheet_id, selected_worksheet, max_age=DATASET_MAX_STALENESS) is None
+            )
+            with rerun_timer.span("analytics.load_data"):
+                if not analytics_deferred:
+                    df, load_error = load_data(gc, sheet_id, selected_worksheet, batch_worksheets)
             
-            if load_error or df.empty:
+            if analytics_deferred:
+                st.info("🪟 Windowed loading is on, so only the current page of rows has been read.")
+                if st.button("📥 Load Full Sheet for Analytics"):
+                    st.session_state["analytics_full_load"] = True
+                    st.rerun()
+            elif load_error or df.empty:
                 st.warning("⚠️ No data available for analytics")
             else:
-                # Overview metrics
-                st.markdown("### 📈 Overview Statistics")
+                # Counters maintained incrementally across appends and refreshes
+                with rerun_timer.span("analytics.overview"):
+                    aggregates = get_aggregates(df, sheet_id, selected_worksheet)
                 
-                col1, col2, col3, col4 = st.columns(4)
+                    # Overview metrics
+                    st.markdown("### 📈 Overview Statistics")
                 
-                with col1:
-                    st.metric(
-                        "📝 Total Entries",
-                        len(df),
-                        help="Total number of records in the sheet"
-                    )
+                    col1, col2, col3, col4 = st.columns(4)
                 
-                with col2:
-                    if video_col_name in df.columns:
-                        video_count = df[video_col_name].astype(str).str.startswith('http').sum()
+                    with col1:
                         st.metric(
-                            "🎬 Videos",
-                            video_count,
-                            help="Number of valid video links"
+                            "📝 Total Entries",
+                            len(df),
+                            help="Total number of records in the sheet"
                         )
-                    else:
-                        st.metric("🎬 Videos", "N/A")
                 
-                with col3:
-                    if 'Category' in df.columns:
-                        unique_categories = df['Category'].nunique()
+                    with col2:
+                        if video_col_name in df.columns:
+                            video_count = aggregates.valid_video_count(df, sheet_id, selected_worksheet, video_col_name)
+                            st.metric(
+                                "🎬 Videos",
+                                video_count,
+                                help="Number of valid video links"
+                            )
+                        else:
+                            st.metric("🎬 Videos", "N/A")
+                
+                    with col3:
+                        if 'Category' in df.columns:
+                            unique_categories = aggregates.unique('Category')
+                            st.metric(
+                                "🏷️ Categories",
+                                unique_categories,
+                                help="Number of unique categories"
+                            )
+                        else:
+                            st.metric("🏷️ Categories", "N/A")
+                
+                    with col4:
                         st.metric(
-                            "🏷️ Categories",
-                            unique_categories,
-                            help="Number of unique categories"
+                            "📋 Columns",
+                            len(df.columns),
+                            help="Number of data columns"
                         )
-                    else:
-                        st.metric("🏷️ Categories", "N/A")
                 
-                with col4:
-                    st.metric(
-                        "📋 Columns",
-                        len(df.columns),
-                        help="Number of data columns"
-                    )
-                
-                st.markdown("---")
+                    st.markdown("---")
                 
                 # Time-based analytics
-                if 'Timestamp' in df.columns:
-                    st.markdown("### 📅 Timeline Analysis")
+                with rerun_timer.span("analytics.timeline"):
+                    if 'Timestamp' in df.columns:
+                        st.markdown("### 📅 Timeline Analysis")
                     
-                    try:
-                        df['Timestamp_Parsed'] = pd.to_datetime(df['Timestamp'], errors='coerce')
-                        df_timeline = df.dropna(subset=['Timestamp_Parsed'])
+                        try:
+                            daily_counts = aggregates.daily_frame()
                         
-                        if not df_timeline.empty:
-                            df_timeline['Date'] = df_timeline['Timestamp_Parsed'].dt.date
-                            daily_counts = df_timeline.groupby('Date').size().reset_index(name='Count')
+                            if not daily_counts.empty:
+                                col1, col2 = st.columns(2)
                             
-                            col1, col2 = st.columns(2)
+                                with col1:
+                                    st.markdown("#### 📊 Entries by Date")
+                                    st.bar_chart(daily_counts.set_index('Date'))
                             
-                            with col1:
-                                st.markdown("#### 📊 Entries by Date")
-                                st.bar_chart(daily_counts.set_index('Date'))
-                            
-                            with col2:
-                                st.markdown("#### 📈 Recent Activity")
-                                recent = daily_counts.tail(7)
-                                st.dataframe(
-                                    recent.rename(columns={'Date': 'Date', 'Count': 'Submissions'}),
-                                    use_container_width=True,
-                                    hide_index=True
-                                )
-                        else:
-                            st.info("💡 No valid timestamps found for timeline analysis")
+                                with col2:
+                                    st.markdown("#### 📈 Recent Activity")
+                                    recent = daily_counts.tail(7)
+                                    st.dataframe(
+                                        recent.rename(columns={'Date': 'Date', 'Count': 'Submissions'}),
+                                        use_container_width=True,
+                                        hide_index=True
+                                    )
+                            else:
+                                st.info("💡 No valid timestamps found for timeline analysis")
                     
-                    except Exception as e:
-                        st.warning(f"⚠️ Could not parse timestamps: {str(e)}")
+                        except Exception as e:
+                            st.warning(f"⚠️ Could not parse timestamps: {str(e)}")
                 
-                st.markdown("---")
+                    st.markdown("---")
                 
                 # Category distribution
-                if 'Category' in df.columns:
-                    st.markdown("### 🏷️ Category Distribution")
+                with rerun_timer.span("analytics.category_distribution"):
+                    if 'Category' in df.columns:
+                        st.markdown("### 🏷️ Category Distribution")
                     
-                    category_counts = df['Category'].value_counts().reset_index()
-                    category_counts.columns = ['Category', 'Count']
+                        category_counts = aggregates.value_counts_frame('Category')
                     
-                    col1, col2 = st.columns([2, 1])
+                        col1, col2 = st.columns([2, 1])
                     
-                    with col1:
-                        st.bar_chart(category_counts.set_index('Category'))
+                        with col1:
+                            st.bar_chart(category_counts.set_index('Category'))
                     
-                    with col2:
-                        st.dataframe(
-                            category_counts,
-                            use_container_width=True,
-                            hide_index=True
-                        )
+                        with col2:
+                            st.dataframe(
+                                category_counts,
+                                use_container_width=True,
+                                hide_index=True
+                            )
                 
                 st.markdown("---")
                 
                 # Data quality metrics
-                st.markdown("### ✅ Data Quality Metrics")
+                with rerun_timer.span("analytics.data_quality"):
+                    st.markdown("### ✅ Data Quality Metrics")
                 
-                col1, col2, col3 = st.columns(3)
+                    col1, col2, col3 = st.columns(3)
                 
-                with col1:
-                    # Completeness
-                    total_cells = len(df) * len(df.columns)
-                    filled_cells = df.count().sum()
-                    completeness = (filled_cells / total_cells * 100) if total_cells > 0 else 0
+                    with col1:
+                        # Completeness
+                        completeness = aggregates.completeness()
                     
-                    st.metric(
-                        "📊 Data Completeness",
-                        f"{completeness:.1f}%",
-                        help="Percentage of non-empty cells"
-                    )
+                        st.metric(
+                            "📊 Data Completeness",
+                            f"{completeness:.1f}%",
+                            help="Percentage of non-empty cells"
+                        )
                 
-                with col2:
-                    # Valid video links
-                    if video_col_name in df.columns:
-                        valid_videos = df[video_col_name].astype(str).str.startswith('http').sum()
-                        total_videos = len(df)
-                        video_validity = (valid_videos / total_videos * 100) if total_videos > 0 else 0
+                    with col2:
+                        # Valid video links
+                        if video_col_name in df.columns:
+                            valid_videos = aggregates.valid_video_count(df, sheet_id, selected_worksheet, video_col_name)
+                            total_videos = aggregates.n_rows
+                            video_validity = (valid_videos / total_videos * 100) if total_videos > 0 else 0
                         
+                            st.metric(
+                                "🎬 Valid Video Links",
+                                f"{video_validity:.1f}%",
+                                help="Percentage of rows with valid video URLs"
+                            )
+                        else:
+                            st.metric("🎬 Valid Video Links", "N/A")
+                
+                    with col3:
+                        # Duplicate check
+                        if 'Title' in df.columns:
+                            duplicates = aggregates.duplicates('Title')
+                            st.metric(
+                                "🔍 Duplicate Titles",
+                                duplicates,
+                                help="Number of duplicate title entries",
+                                delta=f"-{duplicates}" if duplicates > 0 else "0"
+                            )
+                        else:
+                            st.metric("🔍 Duplicates", "N/A")
+
+                # Near-duplicate detection over the incrementally maintained MinHash index
+                with rerun_timer.span("analytics.near_duplicates"):
+                    st.markdown("### 🧬 Near-Duplicate Entries")
+                    duplicate_index = get_duplicate_index(df, sheet_id, selected_worksheet, video_col_name)
+                    rows_a, rows_b, similarity = duplicate_index.near_duplicates()
+
+                    col1, col2 = st.columns(2)
+                    with col1:
                         st.metric(
-                            "🎬 Valid Video Links",
-                            f"{video_validity:.1f}%",
-                            help="Percentage of rows with valid video URLs"
+                            "🎬 Repeated Video URLs",
+                            duplicate_index.duplicate_urls,
+                            help="Rows whose video URL, once normalized, already appears in an earlier row"
                         )
-                    else:
-                        st.metric("🎬 Valid Video Links", "N/A")
-                
-                with col3:
-                    # Duplicate check
-                    if 'Title' in df.columns:
-                        duplicates = df.duplicated(subset=['Title']).sum()
+                    with col2:
                         st.metric(
-                            "🔍 Duplicate Titles",
-                            duplicates,
-                            help="Number of duplicate title entries",
-                            delta=f"-{duplicates}" if duplicates > 0 else "0"
+                            "🧬 Near-Duplicate Pairs",
+                            len(similarity),
+                            help=f"Pairs of rows whose title and description are at least "
+                                 f"{NEAR_DUPLICATE_THRESHOLD:.0%} similar (estimated)"
+                        )
+
+                    if len(similarity):
+                        top = np.argsort(-similarity, kind="stable")[:NEAR_DUPLICATE_DISPLAY_LIMIT]
+                        titles = df['Title'].astype(str) if 'Title' in df.columns else pd.Series("", index=df.index)
+                        st.dataframe(
+                            pd.DataFrame({
+                                "Row A": rows_a[top] + 2,
+                                "Title A": titles.iloc[rows_a[top]].to_numpy(),
+                                "Row B": rows_b[top] + 2,
+                                "Title B": titles.iloc[rows_b[top]].to_numpy(),
+                                "Similarity": similarity[top].round(2),
+                            }),
+                            use_container_width=True,
+                            hide_index=True
                         )
-                    else:
-                        st.metric("🔍 Duplicates", "N/A")
                 
                 # Column statistics
                 st.markdown("---")
                 st.markdown("### 📋 Column Statistics")
                 
-                col_stats = []
-                for col in df.columns:
-                    non_null = df[col].count()
-                    null_count = len(df) - non_null
-                    unique_values = df[col].nunique()
-                    
-                    col_stats.append({
-                        'Column': col,
-                        'Non-Empty': non_null,
-                        'Empty': null_count,
-                        'Unique Values': unique_values,
-                        'Completeness': f"{(non_null/len(df)*100):.1f}%"
-                    })
-                
-                st.dataframe(
-                    pd.DataFrame(col_stats),
-                    use_container_width=True,
-                    hide_index=True
-                )
+                with rerun_timer.span("analytics.column_statistics"):
+                    profile = get_profile(df, sheet_id, selected_worksheet)
+                    st.dataframe(
+                        profile.table(),
+                        use_container_width=True,
+                        hide_index=True
+                    )
+                    st.download_button(
+                        label="📥 Export Column Profile as JSON",
+                        data=profile.to_json(sheet_id, selected_worksheet),
+                        file_name=f'{selected_worksheet}_profile_{datetime.now().strftime("%Y%m%d")}.json',
+                        mime='application/json',
+                    )
+
+        with viewer_tab:
+            if viewer_tab.open:
+                data_viewer()
+        
+        with form_tab:
+            if form_tab.open:
+                submission_form()
+        
+        # The dashboard is only computed while its tab is open
+        with analytics_tab:
+            if analytics_tab.open:
+                analytics_dashboard()
+        
+        # Data freshness of the selected worksheet
+        snapshot = get_dataset_cache().get(sheet_id, selected_worksheet, max_age=DATASET_MAX_STALENESS)
+        if snapshot is not None:
+            data_age = time.time() - snapshot.fetched_at
+            freshness = "🟢 Fresh" if data_age <= DATASET_CACHE_TTL else "🟡 Refreshing in background"
+            st.sidebar.caption(f"{freshness} · fetched {format_age(data_age)} ago")
+
+        # Warm the cache for the other tabs now that the selected one has rendered
+        if prefetch_tabs and not windowed_loading and len(worksheet_titles) > 1:
+            get_tab_prefetcher().schedule(
+                gc, sheet_id, [
+                    title for title in (batch_worksheets if batch_worksheets is not None else worksheet_titles)
+                    if title != selected_worksheet
+                ]
+            )
 
 else:
     # Landing page when no file is uploaded
@@ -1166,6 +4567,68 @@ else:
         - Column statistics
         """)
 
+# --- Sheets API Usage ---
+coalescing_stats = get_singleflight().stats()
+api_counters = get_sheets_rate_limiter().counters
+if coalescing_stats or api_counters:
+    session_counters = get_sheets_rate_limiter().session_counters(current_session_id())
+    with st.sidebar.expander("📡 Sheets API"):
+        st.dataframe(
+            pd.DataFrame(
+                [
+                    (label, session_counters[key], api_counters[key])
+                    for label, key in [("Calls", "calls"), ("Retries", "retries"),
+                                       ("Throttle waits", "throttle_waits"), ("Errors", "errors")]
+                ],
+                columns=["Counter", "This Session", "All Sessions"]
+            ),
+            use_container_width=True,
+            hide_index=True
+        )
+        st.caption(
+            f"Time spent waiting for quota: {session_counters['throttled_seconds']:.1f}s this session, "
+            f"{api_counters['throttled_seconds']:.1f}s overall"
+        )
+        if coalescing_stats:
+            st.dataframe(
+                pd.DataFrame(
+                    [(op, executed, coalesced) for op, (executed, coalesced) in coalescing_stats.items()],
+                    columns=["Operation", "Fetched", "Coalesced"]
+                ),
+                use_container_width=True,
+                hide_index=True
+            )
+            st.caption("Coalesced reads waited for an identical in-flight fetch instead of calling the API.")
+
+# --- Webhook Delivery Status ---
+if webhook_url or os.path.exists(WEBHOOK_OUTBOX_PATH):
+    outbox_stats = get_webhook_outbox().stats()
+    with st.sidebar.expander("📮 Webhook Outbox"):
+        col1, col2 = st.columns(2)
+        col1.metric("⏳ Queued", outbox_stats["pending"])
+        col2.metric("☠️ Dead Letters", outbox_stats["dead"])
+        if outbox_stats["latency_p50"] is not None:
+            st.caption(
+                f"Delivery latency (last 100): p50 {outbox_stats['latency_p50']:.1f}s · "
+                f"p95 {outbox_stats['latency_p95']:.1f}s"
+            )
+        else:
+            st.caption("No deliveries yet")
+
+# --- Performance Panel ---
+with st.sidebar.expander("⏱️ Performance"):
+    run_spans = rerun_timer.ordered_spans()
+    if run_spans:
+        st.dataframe(
+            pd.DataFrame({
+                "Stage": ["\u2003" * span["depth"] + span["name"] for span in run_spans],
+                "ms": [span["duration_ms"] for span in run_spans],
+            }),
+            use_container_width=True,
+            hide_index=True
+        )
+    st.caption(f"This run so far: {rerun_timer.elapsed_ms():.0f} ms · spans are logged to `{PERF_LOG_PATH}`")
+
 # --- Sidebar Footer ---
 st.sidebar.markdown("---")
 st.sidebar.markdown("""
@@ -1191,3 +4654,6 @@ with st.sidebar.expander("❓ Need Help?"):
     - Column names are case-sensitive
     - Video URLs must start with 'http'
     """)
+
+# Record this run's timings for offline analysis
+rerun_timer.write_log(PERF_LOG_PATH, sheet_id=sheet_id, worksheet=selected_worksheet)
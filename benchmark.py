@@ -0,0 +1,275 @@
+"""Benchmarks the app's data paths against an in-memory stand-in for Google Sheets.
+
+The app module is imported in Streamlit's bare mode with get_gspread_client
+swapped for a fake client serving synthetic worksheets, so nothing talks to
+Google. Each benchmark is timed over several runs per dataset size and the
+results are written as a JSON report that can be compared across releases.
+
+    python benchmark.py --rows 1000 100000 1000000 --repeat 3 --output benchmark_report.json
+"""
+
+import argparse
+import json
+import os
+import platform
+import statistics
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+# Keep snapshots and the webhook outbox away from a running app's data
+os.environ.setdefault("VLIVE_DATA_DIR", tempfile.mkdtemp(prefix="vlive_bench_"))
+
+import pandas as pd
+
+import app
+
+SHEET_ID = "benchmark"
+WORKSHEET = "Sheet1"
+HEADER = ["Title", "videoUrl", "Description", "Category", "Tags", "Timestamp"]
+CATEGORIES = ["Tutorial", "Demo", "Review", "Interview", "Live"]
+SEARCH_TERM = "tutorial cats"
+FILTER_EXPRESSION = 'Category = Tutorial AND Timestamp >= 2025-03-01 AND Tags has "demo"'
+VIDEO_PAGE_SIZE = 10
+
+
+# --- Fake Sheets Backend ---
+
+class FakeWorksheet:
+    """In-memory worksheet implementing the gspread calls the app makes."""
+
+    def __init__(self, title, rows):
+        self.title = title
+        self.rows = rows  # header row first
+
+    @property
+    def row_count(self):
+        return len(self.rows)
+
+    @property
+    def col_count(self):
+        return len(self.rows[0])
+
+    def get_all_records(self):
+        header = self.rows[0]
+        return [dict(zip(header, row)) for row in self.rows[1:]]
+
+    def get(self, range_name, **kwargs):
+        first, last = (int(part) for part in range_name.split(":"))
+        return [[str(value) for value in row] for row in self.rows[first - 1:last]]
+
+    def append_rows(self, values, **kwargs):
+        self.rows.extend(values)
+        return {"updates": {"updatedRows": len(values)}}
+
+
+class FakeSpreadsheet:
+    """In-memory spreadsheet holding FakeWorksheets."""
+
+    def __init__(self, sheet_id, worksheets):
+        self.id = sheet_id
+        self._worksheets = {ws.title: ws for ws in worksheets}
+
+    def worksheets(self):
+        return list(self._worksheets.values())
+
+    def worksheet(self, title):
+        return self._worksheets[title]
+
+    def values_batch_get(self, ranges, params=None):
+        value_ranges = []
+        for range_name in ranges:
+            title, _, cells = range_name.partition("!")
+            rows = self._worksheets[title.strip("'").replace("''", "'")].rows
+            rows = rows[:1] if cells == "1:1" else rows
+            value_ranges.append({"range": range_name, "values": [[str(v) for v in row] for row in rows]})
+        return {"valueRanges": value_ranges}
+
+    def get_lastUpdateTime(self):
+        return "1970-01-01T00:00:00.000Z"
+
+
+class FakeClient:
+    """Stands in for the authorized gspread client."""
+
+    def __init__(self, spreadsheets):
+        self._spreadsheets = spreadsheets
+
+    def open_by_key(self, key):
+        return self._spreadsheets[key]
+
+
+def synthetic_rows(n_rows):
+    """Builds a worksheet of n_rows video submissions, header first."""
+    start = datetime(2025, 1, 1)
+    rows = [HEADER]
+    for i in range(n_rows):
+        url = f"https://www.youtube.com/watch?v={i:011d}" if i % 5 else ("n/a" if i % 2 else f"https://vimeo.com/{i}")
+        rows.append([
+            f"Video {i} tutorial about cats {i % 97}",
+            url,
+            f"Description of video {i} with some searchable words like dogs{i % 13}",
+            CATEGORIES[i % len(CATEGORIES)],
+            "demo, howto" if i % 3 else "review",
+            (start + timedelta(minutes=17 * i)).strftime("%Y-%m-%d %H:%M:%S"),
+        ])
+    return rows
+
+
+# --- Benchmarks ---
+
+def reset_caches():
+    """Drops every cached frame, snapshot and per-version artifact so the next run starts cold."""
+    app.invalidate_dataset(SHEET_ID, WORKSHEET)
+    app.get_metadata_cache().invalidate(SHEET_ID)
+    app.get_aggregate_store().clear()
+    app.get_duplicate_index_store().clear()
+    app.get_artifact_store().clear()
+
+
+def clear_artifacts(kind):
+    """Drops the held per-version artifacts of one kind, so the next request builds them cold."""
+    store = app.get_artifact_store()
+    for key in [key for key in store if key[0] == kind]:
+        del store[key]
+
+
+def time_runs(fn, repeat, setup=None):
+    """Returns the wall-clock seconds of repeat calls of fn, running setup untimed before each."""
+    runs = []
+    for _ in range(repeat):
+        if setup is not None:
+            setup()
+        started = time.perf_counter()
+        fn()
+        runs.append(time.perf_counter() - started)
+    return runs
+
+
+def benchmark_size(n_rows, repeat):
+    """Times every benchmark against a worksheet of n_rows rows."""
+    gc = app.get_gspread_client({"benchmark": True})
+    gc.open_by_key(SHEET_ID)._worksheets[WORKSHEET].rows = synthetic_rows(n_rows)
+    reset_caches()
+
+    def load():
+        df, error = app.load_data(gc, SHEET_ID, WORKSHEET)
+        if error:
+            raise RuntimeError(error)
+        return df
+
+    results = {}
+    results["load_data.api"] = time_runs(load, repeat, setup=reset_caches)
+    results["load_data.snapshot"] = time_runs(
+        load, repeat, setup=lambda: app.get_dataset_cache().invalidate(SHEET_ID, WORKSHEET)
+    )
+    df = load()
+    results["load_data.cached"] = time_runs(load, repeat)
+
+    search = lambda: app.get_search_index(df, SHEET_ID, WORKSHEET).search(SEARCH_TERM)
+    results["search.all_columns.cold"] = time_runs(search, repeat, setup=lambda: clear_artifacts("search_index"))
+    results["search.all_columns.warm"] = time_runs(search, repeat)
+
+    export_path = os.path.join(os.environ["VLIVE_DATA_DIR"], "benchmark_export")
+
+    def filtered_csv():
+        mask = app.get_typed_columns(df, SHEET_ID, WORKSHEET).mask(FILTER_EXPRESSION)
+        positions = app.get_search_index(df, SHEET_ID, WORKSHEET).search(SEARCH_TERM)
+        app.write_export(df.iloc[positions[mask[positions]]], "CSV", export_path)
+    results["csv.filtered"] = time_runs(filtered_csv, repeat)
+
+    def video_pages():
+        video_info = app.get_video_columns(df, SHEET_ID, WORKSHEET, "videoUrl")
+        video_data = df[video_info["is_valid"].to_numpy()]
+        timestamps = app.get_typed_columns(df, SHEET_ID, WORKSHEET).datetimes("Timestamp")
+        last_start = max(len(video_data) - VIDEO_PAGE_SIZE, 0)
+        for start in (0, last_start // 2, last_start):
+            page = video_data.iloc[start:start + VIDEO_PAGE_SIZE]
+            video_info.loc[page.index]
+            timestamps.loc[page.index]
+    results["videos.pagination.cold"] = time_runs(
+        video_pages, repeat, setup=lambda: clear_artifacts("video_columns")
+    )
+    results["videos.pagination.warm"] = time_runs(video_pages, repeat)
+
+    upload = df.astype(str)
+    existing = app.get_duplicate_index(df, SHEET_ID, WORKSHEET, "videoUrl")
+    results["import.prepare"] = time_runs(lambda: app.prepare_import(upload, HEADER, "videoUrl", existing), repeat)
+
+    aggregates = lambda: app.get_aggregates(df, SHEET_ID, WORKSHEET)
+    results["analytics.aggregates"] = time_runs(aggregates, repeat, setup=app.get_aggregate_store().clear)
+    results["analytics.overview"] = time_runs(lambda: (
+        aggregates().valid_video_count(df, SHEET_ID, WORKSHEET, "videoUrl"),
+        aggregates().unique("Category"),
+    ), repeat)
+    results["analytics.timeline"] = time_runs(lambda: aggregates().daily_frame(), repeat)
+    results["analytics.category_distribution"] = time_runs(lambda: aggregates().value_counts_frame("Category"), repeat)
+    results["analytics.data_quality"] = time_runs(lambda: (
+        aggregates().completeness(),
+        aggregates().valid_video_count(df, SHEET_ID, WORKSHEET, "videoUrl"),
+        aggregates().duplicates("Title"),
+    ), repeat)
+    results["analytics.near_duplicates"] = time_runs(
+        lambda: app.get_duplicate_index(df, SHEET_ID, WORKSHEET, "videoUrl").near_duplicates(),
+        repeat, setup=app.get_duplicate_index_store().clear
+    )
+    results["analytics.column_statistics"] = time_runs(
+        lambda: app.get_profile(df, SHEET_ID, WORKSHEET).table(), repeat, setup=lambda: clear_artifacts("profile")
+    )
+
+    # A write-through append extends the previous version's artifacts instead of rebuilding them
+    appended = {}
+
+    def append_row():
+        app.on_rows_appended(SHEET_ID, WORKSHEET, [synthetic_rows(n_rows + 1)[-1]])
+        appended["df"] = load()
+
+    def artifacts_after_append():
+        new_df = appended["df"]
+        app.get_search_index(new_df, SHEET_ID, WORKSHEET).search(SEARCH_TERM)
+        app.get_typed_columns(new_df, SHEET_ID, WORKSHEET).mask(FILTER_EXPRESSION)
+        app.get_video_columns(new_df, SHEET_ID, WORKSHEET, "videoUrl")
+        app.get_profile(new_df, SHEET_ID, WORKSHEET).table()
+    results["artifacts.after_append"] = time_runs(artifacts_after_append, repeat, setup=append_row)
+    return results
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, nargs="+", default=[1_000, 100_000, 1_000_000],
+                        help="worksheet sizes to benchmark")
+    parser.add_argument("--repeat", type=int, default=3, help="timed runs per benchmark")
+    parser.add_argument("--output", default="benchmark_report.json", help="path of the JSON report")
+    args = parser.parse_args(argv)
+
+    fake_client = FakeClient({SHEET_ID: FakeSpreadsheet(SHEET_ID, [FakeWorksheet(WORKSHEET, [HEADER])])})
+    app.get_gspread_client = lambda service_account_info, fingerprint=None: fake_client
+
+    report = {
+        "generated_at": datetime.now().isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "pandas": pd.__version__,
+        "platform": platform.platform(),
+        "repeat": args.repeat,
+        "results": [],
+    }
+    for n_rows in args.rows:
+        print(f"Benchmarking {n_rows:,} rows...", file=sys.stderr)
+        for name, runs in benchmark_size(n_rows, args.repeat).items():
+            report["results"].append({
+                "rows": n_rows,
+                "benchmark": name,
+                "median_seconds": statistics.median(runs),
+                "min_seconds": min(runs),
+                "runs": runs,
+            })
+            print(f"  {name:<36} {statistics.median(runs) * 1000:10.1f} ms", file=sys.stderr)
+
+    with open(args.output, "w") as f:
+        json.dump(report, f, indent=2)
+    print(f"Report written to {args.output}", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
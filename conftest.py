@@ -0,0 +1,9 @@
+"""Pytest setup: the app is imported from the repo root with its local state in a temporary directory."""
+
+import os
+import tempfile
+
+
+def pytest_configure(config):
+    # app reads VLIVE_DATA_DIR at import time, before any fixture could run
+    os.environ.setdefault("VLIVE_DATA_DIR", tempfile.mkdtemp(prefix="vlive_test_"))
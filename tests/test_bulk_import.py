@@ -0,0 +1,38 @@
+"""Tests for reading, claiming and writing bulk imports."""
+
+import json
+
+import app
+import benchmark
+
+
+def test_json_lists_are_joined_like_form_tags():
+    data = json.dumps([{"Title": "a", "Tags": ["demo", "howto"], "Category": None}]).encode("utf-8")
+    frame = app.read_import_file("videos.json", data)
+    assert frame.to_dict("records") == [{"Title": "a", "Tags": "demo, howto", "Category": ""}]
+
+
+def test_an_import_is_claimed_by_one_process_at_a_time(tmp_path):
+    # Two stores over one directory stand in for two server processes
+    first, second = app.ImportCheckpoints(str(tmp_path)), app.ImportCheckpoints(str(tmp_path))
+    key = first.key(b"rows", "sheet", "tab")
+    with first.claim(key) as claimed:
+        assert claimed
+        with second.claim(key) as claimed_elsewhere:
+            assert not claimed_elsewhere
+    with second.claim(key) as claimed:
+        assert claimed
+
+
+def test_import_writes_through_once(monkeypatch):
+    worksheet = benchmark.FakeWorksheet("import", [["Title", "videoUrl"]])
+    gc = benchmark.FakeClient({"import-sheet": benchmark.FakeSpreadsheet("import-sheet", [worksheet])})
+    written_through = []
+    monkeypatch.setattr(app, "on_rows_appended", lambda sheet_id, name, rows: written_through.append(len(rows)))
+
+    values = [[f"video {i}", f"https://vimeo.com/{i}"] for i in range(25)]
+    checkpoint = {"header": ["Title", "videoUrl"], "positions": list(range(25)), "written": 0}
+    written = app.run_import(gc, "import-sheet", "import", values, "import-key", checkpoint, chunk_rows=10)
+    assert written == 25
+    assert len(worksheet.rows) == 26
+    assert written_through == [25]
@@ -0,0 +1,117 @@
+"""Tests for writing appended rows through to the cached worksheet frames."""
+
+import threading
+import time
+
+import numpy as np
+import pandas as pd
+
+import app
+import benchmark
+
+
+def test_appended_rows_keep_the_snapshot_dtypes():
+    store, cache = app.get_snapshot_store(), app.get_dataset_cache()
+    df = pd.DataFrame({"Title": ["a", "b"], "Count": [1, ""], "Views": [10, 20]})
+    snapshot = store.write("sheet", "append", df)
+    cache.put("sheet", "append", snapshot)
+
+    app.on_rows_appended("sheet", "append", [["c", "5", "30"]])
+    cached = cache.get("sheet", "append")
+    assert cached.df["Count"].tolist() == ["1", "", "5"]
+    assert cached.df["Views"].tolist() == [10, 20, 30]
+    assert cached.parent_version == snapshot.version
+
+    stored = store.read("sheet", "append")
+    assert stored.version == cached.version
+    pd.testing.assert_frame_equal(stored.df, cached.df)
+
+
+def test_refresh_does_not_overwrite_rows_written_through_meanwhile():
+    store, cache = app.get_snapshot_store(), app.get_dataset_cache()
+    rows = [["Title", "Views"], ["a", 1], ["b", 2]]
+    worksheet = benchmark.FakeWorksheet("race", rows)
+    gc = benchmark.FakeClient({"race-sheet": benchmark.FakeSpreadsheet("race-sheet", [worksheet])})
+    stale = store.write("race-sheet", "race", pd.DataFrame({"Title": ["a", "b"], "Views": [1, 2]}),
+                        fetched_at=time.time() - app.DATASET_CACHE_TTL)
+    cache.put("race-sheet", "race", stale)
+
+    # An append is written through while the refresh is still reading the sheet
+    appender = threading.Thread(target=app.on_rows_appended, args=("race-sheet", "race", [["c", "3"]]))
+    get_all_records = worksheet.get_all_records
+
+    def slow_get_all_records():
+        appender.start()
+        time.sleep(0.2)
+        return get_all_records()
+
+    worksheet.get_all_records = slow_get_all_records
+    app.DatasetRefresher().refresh(gc, "race-sheet", "race")
+    appender.join()
+
+    cached, stored = cache.get("race-sheet", "race"), store.read("race-sheet", "race")
+    assert stored.version == cached.version
+    assert stored.df["Title"].tolist() == cached.df["Title"].tolist() == ["a", "b", "c"]
+
+
+def test_prefetch_backs_off_from_a_failing_tab():
+    good = benchmark.FakeWorksheet("good", [["Title"], ["a"]])
+    bad = benchmark.FakeWorksheet("bad", [["Title", "Title"], ["a", "b"]])  # duplicated header
+    spreadsheet = benchmark.FakeSpreadsheet("prefetch-sheet", [good, bad])
+    gc = benchmark.FakeClient({"prefetch-sheet": spreadsheet})
+    batch_calls = []
+    values_batch_get = spreadsheet.values_batch_get
+    spreadsheet.values_batch_get = lambda ranges, **kwargs: batch_calls.append(ranges) or values_batch_get(ranges, **kwargs)
+
+    prefetcher = app.TabPrefetcher(retry_base=60)
+    prefetcher.schedule(gc, "prefetch-sheet", ["good", "bad"])
+    prefetcher._executor.submit(lambda: None).result()
+    assert app.get_dataset_cache().get("prefetch-sheet", "good") is not None
+    assert app.get_dataset_cache().get("prefetch-sheet", "bad") is None
+
+    calls = len(batch_calls)
+    prefetcher.schedule(gc, "prefetch-sheet", ["good", "bad"])
+    prefetcher._executor.submit(lambda: None).result()
+    assert len(batch_calls) == calls
+
+
+def test_appends_are_written_through_before_they_are_acknowledged():
+    worksheet = benchmark.FakeWorksheet("queue", [["Title"], ["a"]])
+    gc = benchmark.FakeClient({"queue-sheet": benchmark.FakeSpreadsheet("queue-sheet", [worksheet])})
+    futures, seen = [], []
+
+    def on_flushed(sheet_id, worksheet_name, rows):
+        seen.append([future.done() for future in futures])
+        raise RuntimeError("cache maintenance failed")
+
+    queue = app.AppendQueue(flush_interval=0.01, on_flushed=on_flushed)
+    futures.append(queue.submit(gc, "queue-sheet", "queue", ["b"]))
+    assert futures[0].result(timeout=5) == {"updates": {"updatedRows": 1}}
+    assert seen == [[False]]
+
+
+def test_appends_extend_the_previous_versions_artifacts():
+    store, cache = app.get_snapshot_store(), app.get_dataset_cache()
+    rows = benchmark.synthetic_rows(300)
+    snapshot = store.write("sheet", "artifacts", pd.DataFrame(rows[1:], columns=rows[0]))
+    cache.put("sheet", "artifacts", snapshot)
+    df = app.with_snapshot_attrs(cache.get("sheet", "artifacts"))
+    index = app.get_search_index(df, "sheet", "artifacts")
+    index.search("cats")
+    app.get_profile(df, "sheet", "artifacts")
+    app.get_video_columns(df, "sheet", "artifacts", "videoUrl")
+
+    app.on_rows_appended("sheet", "artifacts", benchmark.synthetic_rows(303)[-3:])
+    df = app.with_snapshot_attrs(cache.get("sheet", "artifacts"))
+    extended = app.get_search_index(df, "sheet", "artifacts")
+    assert extended.n_rows == 303 and extended._trigrams is not None  # extended, not rebuilt
+    assert np.array_equal(extended.search("tutorial cats"), app.SearchIndex(df).search("tutorial cats"))
+    typed = app.get_typed_columns(df, "sheet", "artifacts")
+    pd.testing.assert_frame_equal(typed.frame, app.TypedColumns(df).frame)
+    assert app.get_profile(df, "sheet", "artifacts").columns == app.DatasetProfile(df, typed.schema).columns
+    pd.testing.assert_frame_equal(
+        app.get_video_columns(df, "sheet", "artifacts", "videoUrl"), app.derive_video_columns(df["videoUrl"])
+    )
+    # Only the latest version is held
+    held = [slot for key, slot in app.get_artifact_store().items() if key[1:3] == ("sheet", "artifacts")]
+    assert len(held) == 4 and all(slot.version == df.attrs["dataset_version"] for slot in held)
@@ -0,0 +1,63 @@
+"""Tests for the MinHash signatures and duplicate index, with the app imported in Streamlit's bare mode."""
+
+import numpy as np
+import pandas as pd
+
+import app
+
+NO_TEXT = np.iinfo(np.uint32).max
+
+
+def test_short_texts_get_empty_signatures():
+    for texts in (["ab", "cd"], ["a", "bc", "d"], [""], []):
+        signatures = app.minhash_signatures(texts)
+        assert signatures.shape == (len(texts), app.MINHASH_PERMUTATIONS)
+        assert (signatures == NO_TEXT).all()
+
+
+def test_short_texts_next_to_long_ones():
+    signatures = app.minhash_signatures(["ab", "a longer title", "cd"])
+    assert (signatures[[0, 2]] == NO_TEXT).all()
+    assert (signatures[1] != NO_TEXT).all()
+
+
+def test_near_duplicates_pairs_every_row_of_a_bucket():
+    titles = ["How to bake sourdough bread at home"] * 6 + [f"Unrelated video number {i}" for i in range(20)]
+    df = pd.DataFrame({"Title": titles, "videoUrl": [f"https://example.com/{i}.mp4" for i in range(len(titles))]})
+    index = app.DuplicateIndex("videoUrl")
+    index.sync(df)
+    row_a, row_b, similarity = index.near_duplicates()
+    found = dict(zip(zip(row_a.tolist(), row_b.tolist()), similarity.tolist()))
+    identical = [(a, b) for a in range(6) for b in range(a + 1, 6)]
+    assert [found.get(pair) for pair in identical] == [1.0] * len(identical)
+
+
+def test_url_lookup_does_not_sign_texts():
+    df = pd.DataFrame({"Title": ["First video", "Second video"],
+                       "videoUrl": ["https://youtu.be/abcdefghijk", "https://vimeo.com/123"]})
+    df.attrs["dataset_version"] = "v1"
+    index = app.DuplicateIndex("videoUrl")
+    index.sync(df)
+    assert index.find_url("https://www.youtube.com/watch?v=abcdefghijk&t=3") == 0
+    assert index.find_url("https://vimeo.com/456") is None
+    assert len(index.signatures) == 0
+
+    appended = pd.concat([df, pd.DataFrame({"Title": ["First video"], "videoUrl": ["https://vimeo.com/456"]})],
+                         ignore_index=True)
+    appended.attrs.update(dataset_version="v2", parent_version="v1")
+    index.sync(appended)
+    assert index.find_url("https://vimeo.com/456") == 2
+    row_a, row_b, _ = index.near_duplicates()
+    assert (row_a.tolist(), row_b.tolist()) == ([0], [2])
+    assert len(index.signatures) == 3
+
+
+def test_trailing_slashes_are_dropped_before_the_query():
+    urls = pd.Series([
+        "https://example.com/a/?b=1", "https://Example.com/a?b=1&utm_source=x", "https://example.com/a//",
+        "https://example.com/a", "https://example.com/?next=/c/", "https://example.com?next=/c/",
+    ])
+    keys = app.canonical_video_urls(urls).tolist()
+    assert keys[0] == keys[1] == "https://example.com/a?b=1"
+    assert keys[2] == keys[3] == "https://example.com/a"
+    assert keys[4] == keys[5] == "https://example.com?next=/c/"
@@ -0,0 +1,21 @@
+"""Tests for the on-disk export cache."""
+
+import pandas as pd
+
+import app
+
+
+def test_an_open_export_survives_eviction(tmp_path, monkeypatch):
+    monkeypatch.setattr(app, "APP_DATA_DIR", str(tmp_path))
+    cache = app.ExportCache(str(tmp_path / "exports"), max_files=1)
+    df = pd.DataFrame({"Title": ["a", "b"], "Views": [1, 2]})
+
+    first = cache.build(("sheet", "tab", "v1"), "CSV", df)
+    second = cache.build(("sheet", "tab", "v2"), "CSV", df.iloc[:1])  # evicts the first file
+    with first, second:
+        assert first.read() == b"Title,Views\na,1\nb,2\n"
+        assert second.read() == b"Title,Views\na,1\n"
+    assert len([path for path in (tmp_path / "exports").iterdir() if path.suffix == ".csv"]) == 1
+
+    with cache.build(("sheet", "tab", "v1"), "CSV", df) as rebuilt:
+        assert rebuilt.read() == b"Title,Views\na,1\nb,2\n"
@@ -0,0 +1,21 @@
+"""Tests for filter expressions over typed columns."""
+
+import pandas as pd
+import pytest
+
+import app
+
+
+def typed_columns():
+    df = pd.DataFrame({"Timestamp": ["2025-01-01 10:00:00", "2025-03-01 10:00:00"], "Category": ["Demo", "Review"]})
+    return app.get_typed_columns(df, "sheet", "tab")
+
+
+def test_date_comparison():
+    assert typed_columns().mask("Timestamp >= 2025-02-01").tolist() == [False, True]
+
+
+@pytest.mark.parametrize("value", ["2025-02-30", "2025-13-01"])
+def test_impossible_dates_are_syntax_errors(value):
+    with pytest.raises(app.FilterSyntaxError, match="invalid date"):
+        typed_columns().mask(f"Timestamp >= {value}")
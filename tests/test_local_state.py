@@ -0,0 +1,38 @@
+"""Tests for the permissions of the app's local state directory."""
+
+import os
+import stat
+
+import pandas as pd
+import pytest
+
+import app
+
+
+def mode(path):
+    return stat.S_IMODE(os.stat(path).st_mode)
+
+
+def test_state_is_private_to_this_user(tmp_path, monkeypatch):
+    data_dir = tmp_path / "vlive"
+    monkeypatch.setattr(app, "APP_DATA_DIR", str(data_dir))
+    store = app.SnapshotStore(str(data_dir / "snapshots"))
+    store.write("sheet", "tab", pd.DataFrame({"Title": ["a"]}))
+    with store.writer_lock("sheet", "tab"):
+        pass
+    outbox = app.WebhookOutbox(str(data_dir / "outbox.sqlite3"))
+    outbox.enqueue("https://example.com/hook", {"row": 1})
+
+    assert mode(data_dir) == mode(data_dir / "snapshots") == 0o700
+    files = [path for path in data_dir.rglob("*") if path.is_file()]
+    assert files and {mode(path) for path in files} == {0o600}
+
+
+@pytest.mark.skipif(not hasattr(os, "geteuid") or os.geteuid() != 0, reason="needs root to chown")
+def test_a_directory_owned_by_another_user_is_refused(tmp_path, monkeypatch):
+    data_dir = tmp_path / "vlive"
+    data_dir.mkdir()
+    os.chown(data_dir, 12345, 12345)
+    monkeypatch.setattr(app, "APP_DATA_DIR", str(data_dir))
+    with pytest.raises(PermissionError):
+        app.SnapshotStore(str(data_dir / "snapshots"))
@@ -0,0 +1,24 @@
+"""Tests for the full-text search index."""
+
+import numpy as np
+import pandas as pd
+
+import app
+import benchmark
+
+QUERIES = ["tutorial cats", "video 1995", "dogs3", '"about cats 4"', "ca", "zebra", "https", "review"]
+
+
+def test_extended_index_answers_like_a_full_build():
+    rows = benchmark.synthetic_rows(2000)
+    df = pd.DataFrame(rows[1:], columns=rows[0])
+    df.loc[1990, "Title"] = "A zebra crossing tutorial"  # a token first seen in the appended rows
+
+    index = app.SearchIndex(df.iloc[:1000])
+    index.search("cats")  # builds the trigram index, which extending carries over
+    for end in (1001, 1990, 2000):
+        index = index.extended(df.iloc[:end])
+        full = app.SearchIndex(df.iloc[:end])
+        for query in QUERIES:
+            for column in (None, "Title"):
+                assert np.array_equal(index.search(query, column), full.search(query, column)), (end, query, column)
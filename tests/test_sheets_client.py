@@ -0,0 +1,49 @@
+"""Tests for retrying Sheets API requests."""
+
+import json
+
+import requests
+
+import app
+
+
+class FailingSession:
+    """Answers every request with the same error response and counts the calls."""
+
+    def __init__(self, status, reason="backendError"):
+        self.status, self.reason, self.calls = status, reason, []
+
+    def request(self, method, url, **kwargs):
+        self.calls.append(method)
+        response = requests.Response()
+        response.status_code = self.status
+        response._content = json.dumps(
+            {"error": {"code": self.status, "message": "failed", "errors": [{"domain": self.reason}]}}
+        ).encode()
+        return response
+
+
+def failed_calls(monkeypatch, method, status, reason="backendError"):
+    monkeypatch.setattr(app, "SHEETS_BACKOFF_BASE", 0)
+    # A private limiter, so draining it on 429s does not throttle the other tests
+    limiter = app.SheetsRateLimiter(reads_per_minute=10**6, writes_per_minute=10**6, background_reserve=0)
+    monkeypatch.setattr(app, "get_sheets_rate_limiter", lambda: limiter)
+    session = FailingSession(status, reason)
+    client = app.RateLimitedHTTPClient(None, session=session)
+    try:
+        client.request(method, "https://sheets.googleapis.com/v4/spreadsheets/id/values/A1:append")
+    except app.APIError:
+        pass
+    return len(session.calls)
+
+
+def test_server_errors_are_retried_for_reads_only(monkeypatch):
+    assert failed_calls(monkeypatch, "GET", 503) == app.SHEETS_MAX_ATTEMPTS
+    assert failed_calls(monkeypatch, "POST", 503) == 1
+    assert failed_calls(monkeypatch, "POST", 408) == 1
+
+
+def test_quota_errors_are_retried_for_writes(monkeypatch):
+    assert failed_calls(monkeypatch, "POST", 429) == app.SHEETS_MAX_ATTEMPTS
+    assert failed_calls(monkeypatch, "POST", 403, reason="usageLimits") == app.SHEETS_MAX_ATTEMPTS
+    assert failed_calls(monkeypatch, "POST", 403, reason="global") == 1
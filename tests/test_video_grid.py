@@ -0,0 +1,21 @@
+"""Tests for rendering the video grid."""
+
+import json
+
+import pandas as pd
+
+import app
+
+
+def test_cell_values_cannot_break_out_of_the_cards_script(monkeypatch):
+    rendered = []
+    monkeypatch.setattr(app.st, "iframe", lambda html, **kwargs: rendered.append((html, kwargs)))
+    title = "Tricky <!--<script> title </script><b>"
+    page = pd.DataFrame({"Title": [title], "videoUrl": ["https://youtu.be/abcdefghijk"]})
+    app.render_video_grid(page, app.derive_video_columns(page["videoUrl"]), ["Title"], columns=3)
+
+    (html, kwargs), = rendered
+    assert kwargs == {"height": "content"}
+    cards_json = html.split("const cards = ", 1)[1].split(";\n", 1)[0]
+    assert "<" not in cards_json
+    assert json.loads(cards_json)[0]["title"] == title
@@ -0,0 +1,36 @@
+"""Tests for the webhook outbox dispatcher."""
+
+import time
+
+import requests
+
+import app
+
+
+def test_dispatcher_survives_unexpected_errors(tmp_path, monkeypatch):
+    monkeypatch.setattr(app, "APP_DATA_DIR", str(tmp_path))
+    outbox = app.WebhookOutbox(str(tmp_path / "outbox.sqlite3"))
+    delivered = []
+
+    def post(url, data, timeout):
+        delivered.append(url)
+        response = requests.Response()
+        response.status_code = 204
+        return response
+
+    outbox.session.post = post
+    claim = outbox._claim
+    failures = iter([RuntimeError("unexpected")])
+
+    def failing_claim(limit):
+        for error in failures:
+            raise error
+        return claim(limit)
+
+    outbox._claim = failing_claim
+    outbox.enqueue("https://example.com/hook", {"row": 1})
+    deadline = time.time() + 5
+    while not delivered and time.time() < deadline:
+        time.sleep(0.05)
+    assert delivered == ["https://example.com/hook"]
+    assert outbox._thread.is_alive()